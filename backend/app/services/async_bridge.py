@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+
+class StreamClosed(Exception):
+    """Raised inside the producer thread once the consumer has stopped reading"""
+
+
+class ThreadChannel:
+    """
+    Producer side of iterate_in_thread. `send` hands one item to the event
+    loop and blocks the calling thread while the consumer is a full buffer
+    behind, so a fast producer cannot outrun a slow client.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self._loop = loop
+        self._queue = queue
+        self._closed = threading.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def close(self):
+        self._closed.set()
+
+    def send(self, item: Any):
+        if self.closed:
+            raise StreamClosed()
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return
+            except concurrent.futures.TimeoutError:
+                if self.closed:
+                    future.cancel()
+                    raise StreamClosed()
+
+
+async def iterate_in_thread(
+    produce: Callable[[ThreadChannel], None],
+    run: Optional[Callable[..., Awaitable[Any]]] = None,
+    max_buffer: int = 8
+) -> AsyncIterator[Any]:
+    """
+    Run the blocking `produce(channel)` on a worker thread (through `run`,
+    e.g. BoundedExecutor.run; the loop's default executor otherwise) and
+    yield every item it sends as it arrives. Exceptions raised by the
+    producer are re-raised here after the items sent before them. When the
+    consumer stops early the channel closes and the producer's next send
+    raises StreamClosed, ending its work.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+    channel = ThreadChannel(loop, queue)
+
+    def job():
+        try:
+            produce(channel)
+        except StreamClosed:
+            pass
+
+    if run is None:
+        task = loop.run_in_executor(None, job)
+    else:
+        task = asyncio.ensure_future(run(job))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    getter = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+                continue
+
+            # Producer finished: everything it sent is already queued
+            getter.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+            task.result()
+            return
+    finally:
+        channel.close()
+        if getter is not None and not getter.done():
+            getter.cancel()
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import math
+import unicodedata
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.services.vector_store import _matches
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "did", "do", "does",
+    "for", "from", "have", "how", "i", "in", "is", "it", "me", "my", "of", "on",
+    "or", "s", "tell", "that", "the", "this", "to", "was", "what", "whats", "when",
+    "where", "which", "who", "with", "you", "your", "about"
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[@.+_-][a-z0-9]+)*")
+
+# Bump when tokenize() changes; persisted postings from another version are rebuilt
+TOKENIZER_VERSION = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps emails, versions and phone numbers intact.
+    NFKC folds PDF ligatures and full-width forms ("winﬁeld" -> "winfield")."""
+    return [token for token in TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring. Documents and metadata
+    are stored alongside the postings so sparse-only hits can be returned
+    without a round trip to the vector store. Persisted as one JSON file.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.avg_doc_length = 0.0
+
+    def build(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        self.ids, self.documents, self.metadatas = list(ids), list(documents), list(metadatas)
+        self.doc_lengths = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_idx, document in enumerate(self.documents):
+            tokens = tokenize(document)
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_idx, tf))
+        self.postings = postings
+        self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.ids)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Top-k documents by BM25 score (only documents sharing a query term)"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_idx, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_idx] / (self.avg_doc_length or 1))
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        hits = []
+        for doc_idx, score in ranked:
+            if not _matches(self.metadatas[doc_idx], where):
+                continue
+            hits.append({
+                'id': self.ids[doc_idx],
+                'content': self.documents[doc_idx],
+                'metadata': self.metadatas[doc_idx],
+                'bm25_score': score
+            })
+            if len(hits) >= k:
+                break
+        return hits
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "tokenizer_version": TOKENIZER_VERSION,
+            "ids": self.ids,
+            "documents": self.documents,
+            "metadatas": self.metadatas,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        index = cls(k1=data["k1"], b=data["b"])
+        if data.get("tokenizer_version") != TOKENIZER_VERSION:
+            index.build(data["ids"], data["documents"], data["metadatas"])
+            return index
+        index.ids = data["ids"]
+        index.documents = data["documents"]
+        index.metadatas = data["metadatas"]
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = {term: [tuple(p) for p in postings] for term, postings in data["postings"].items()}
+        index.avg_doc_length = sum(index.doc_lengths) / len(index.doc_lengths) if index.doc_lengths else 0.0
+        return index
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """Load a persisted index, or None if there is none yet"""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked hit lists by summing 1 / (k + rank). Hits are matched by id;
+    fields from every list are merged into one dict with an 'rrf_score'.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            entry = fused.setdefault(hit['id'], {'rrf_score': 0.0})
+            for key, value in hit.items():
+                entry.setdefault(key, value)
+            entry['rrf_score'] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda hit: hit['rrf_score'], reverse=True)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool for blocking work called from async code.
+    At most max_workers + max_queue jobs are handed to the pool at once;
+    further callers wait on the event loop (never in a thread) until a slot
+    frees up. Queue depth, concurrency and timings are tracked for /api/health.
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, max_queue: int = 32):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_pending = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and await its result"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+
+        submitted_at = time.perf_counter()
+        started = threading.Event()
+        with self._lock:
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+        def job():
+            started_at = time.perf_counter()
+            with self._lock:
+                started.set()
+                self.pending -= 1
+                self.active += 1
+                self.total_wait += started_at - submitted_at
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run += time.perf_counter() - started_at
+
+        try:
+            async with self._slots:
+                result = await asyncio.get_running_loop().run_in_executor(self._pool, job)
+        except BaseException:
+            with self._lock:
+                if not started.is_set():
+                    # Cancelled before reaching a worker thread
+                    self.pending -= 1
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.pending,
+            "max_queue_depth": self.max_pending,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait / finished * 1000, 2) if finished else 0.0,
+            "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0.0
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,281 @@
+"""
+Resume-aware, token-sized chunking.
+
+Splits resume text along its sections (experience, projects, skills,
+education, contact) and packs lines into chunks sized in tokens of the
+serving model's tokenizer, so retrieved context maps directly onto the
+LLM's prompt budget. Every chunk carries the section it came from.
+"""
+
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+SECTIONS = ("summary", "contact", "experience", "projects", "skills", "education")
+
+SECTION_HEADINGS = [
+    ("experience", re.compile(r"^(professional |work )?(experience|employment( history)?|work history)$|^professional work$")),
+    ("projects", re.compile(r"^(personal |key |side )?(projects?|works)$")),
+    ("skills", re.compile(r"^(professional |technical |core |key )?skills( & tools)?$|^tech(nical)? stack$")),
+    ("education", re.compile(r"^education|^academic|^qualifications?$")),
+    ("contact", re.compile(r"^contact( info(rmation)?| details)?$|^personal (info|information|details)$|^(work )?links$")),
+    ("summary", re.compile(r"^(professional )?(summary|profile|objective)$|^about( me)?$")),
+]
+
+# "12/2023 - Present", "11/2021 - 10/2023", "2020 - 2021": lines like these start a new entry
+DATE_RANGE = re.compile(r"\b(\d{1,2}/)?\d{4}\s*[-–]\s*((\d{1,2}/)?\d{4}|present|current)\b", re.IGNORECASE)
+
+# Bulleted lines belong to the entry above them, never to the header of the next one
+BULLET = re.compile(r"^[•●◦▪*\-–]\s")
+MAX_HEADER_LINES = 3
+
+APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_token_count(text: str) -> int:
+    """Rough subword estimate (~1.3 tokens per word) when no tokenizer is available"""
+    return int(len(APPROX_TOKEN.findall(text)) * 1.3) + 1
+
+
+def load_tokenizer(candidates: Iterable[Optional[str]]):
+    """
+    First tokenizer that loads from `candidates` (a tokenizer.json file, a
+    model directory, or a hub id), or None. Uses the standalone tokenizers
+    library so no torch import is needed.
+    """
+    try:
+        from tokenizers import Tokenizer
+    except ImportError:
+        return None
+
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            if os.path.isdir(candidate):
+                return Tokenizer.from_file(os.path.join(candidate, "tokenizer.json"))
+            elif os.path.isfile(candidate):
+                return Tokenizer.from_file(candidate)
+            elif candidate.startswith((".", "/")):
+                continue  # local path that does not exist (yet)
+            else:
+                return Tokenizer.from_pretrained(candidate)
+        except Exception as e:
+            print(f"⚠️ Could not load tokenizer {candidate}: {e}")
+
+    return None
+
+
+def load_token_counter(candidates: Iterable[Optional[str]]) -> Callable[[str], int]:
+    """Token counter backed by load_tokenizer, or the approximate count without one"""
+    tokenizer = load_tokenizer(candidates)
+    if tokenizer is None:
+        return approximate_token_count
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def serving_tokenizer_candidates() -> List[Optional[str]]:
+    """Where to find the serving model's tokenizer, most specific first"""
+    return [os.getenv("CHUNK_TOKENIZER"), os.getenv("MODEL_PATH"), "./models/sarim-llama-3.2-1b"]
+
+
+def create_chunker() -> "ResumeChunker":
+    """Chunker configured from CHUNK_* settings, sized in serving-model tokens"""
+    return ResumeChunker(
+        load_token_counter(serving_tokenizer_candidates()),
+        max_tokens=int(os.getenv("CHUNK_MAX_TOKENS", "128")),
+        overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "16"))
+    )
+
+
+def detect_section(line: str) -> Optional[str]:
+    """Return the section a heading line opens, or None for regular lines"""
+    heading = line.strip().strip(":").strip().lower()
+    if not heading or len(heading.split()) > 4:
+        return None
+    for section, pattern in SECTION_HEADINGS:
+        if pattern.search(heading):
+            return section
+    return None
+
+
+class ResumeChunker:
+    """Packs resume lines into section-scoped chunks of at most max_tokens"""
+
+    def __init__(self, count_tokens: Callable[[str], int], max_tokens: int = 128, overlap_tokens: int = 16):
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def _split_long_line(self, line: str) -> List[str]:
+        """Break a line that alone exceeds the budget at sentence, then word boundaries"""
+        pieces, current = [], ""
+        for part in re.split(r"(?<=[.;,])\s+|\s+", line):
+            candidate = f"{current} {part}".strip()
+            if current and self.count_tokens(candidate) > self.max_tokens:
+                pieces.append(current)
+                current = part
+            else:
+                current = candidate
+        if current:
+            pieces.append(current)
+        return pieces
+
+    @staticmethod
+    def _entry_header(lines: List[str]) -> int:
+        """
+        Number of trailing lines that head the entry a following date line
+        belongs to ("Software Engineer", "Tavant Technologies • Bengaluru").
+        Stops at a bullet or at the previous entry's date line.
+        """
+        count = 0
+        for line in reversed(lines):
+            if count == MAX_HEADER_LINES or BULLET.match(line) or DATE_RANGE.search(line):
+                break
+            count += 1
+        return count
+
+    def _pack(self, lines: List[str], section: str, prefix: str = "") -> Iterator[Dict[str, Any]]:
+        """Greedily pack lines into chunks, repeating `prefix` and overlapping the tail"""
+        budget = self.max_tokens - (self.count_tokens(prefix) if prefix else 0)
+        current: List[str] = []
+        current_tokens = 0
+
+        def emit():
+            body = "\n".join(current)
+            return {"text": f"{prefix}{body}" if prefix else body, "section": section}
+
+        for line in lines:
+            line_tokens = self.count_tokens(line)
+            if line_tokens > budget:
+                if current:
+                    yield emit()
+                    current, current_tokens = [], 0
+                for piece in self._split_long_line(line):
+                    yield {"text": f"{prefix}{piece}" if prefix else piece, "section": section}
+                continue
+
+            # Start a new chunk at entry boundaries once the current one is reasonably full.
+            # The entry's title/company lines come before its dates, so they move with it.
+            header = 0
+            starts_entry = bool(DATE_RANGE.search(line)) and current_tokens > budget // 2
+            if starts_entry:
+                header = self._entry_header(current)
+                header_tokens = sum(self.count_tokens(previous) for previous in current[-header:]) if header else 0
+                # Keep the date with the lines before it when they are all header
+                # or the moved entry would not fit
+                starts_entry = header < len(current) and header_tokens + line_tokens <= budget
+            if current and (current_tokens + line_tokens > budget or starts_entry):
+                moved = current[len(current) - header:] if starts_entry and header else []
+                if moved:
+                    current = current[:len(current) - header]
+                yield emit()
+                # Carry trailing lines over as overlap, unless this is a fresh entry
+                overlap, overlap_tokens = moved, sum(self.count_tokens(previous) for previous in moved)
+                if not starts_entry:
+                    for previous in reversed(current):
+                        tokens = self.count_tokens(previous)
+                        if overlap_tokens + tokens > self.overlap_tokens:
+                            break
+                        overlap.insert(0, previous)
+                        overlap_tokens += tokens
+                current, current_tokens = overlap, overlap_tokens
+
+            current.append(line)
+            current_tokens += line_tokens
+
+        if current:
+            yield emit()
+
+    def chunk_stream(self, pages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Chunk page texts as they arrive; sections carry over page breaks"""
+        section = "summary"
+        lines: List[str] = []
+        for page_text in pages:
+            for raw_line in page_text.splitlines():
+                line = raw_line.strip()
+                if not line:
+                    continue
+                heading = detect_section(line)
+                if heading:
+                    yield from self._pack(lines, section)
+                    section, lines = heading, []
+                else:
+                    lines.append(line)
+            # Flush whatever fits completely so chunks stream out page by page
+            if lines and sum(self.count_tokens(line) for line in lines) > self.max_tokens:
+                packed = list(self._pack(lines, section))
+                yield from packed[:-1]
+                lines = packed[-1]["text"].split("\n")
+        yield from self._pack(lines, section)
+
+    def chunk_text(self, text: str) -> List[Dict[str, Any]]:
+        return list(self.chunk_stream([text]))
+
+    def chunk_structured(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Section-tagged chunks from structured resume JSON. Accepts both the
+        flat schema (name, projects, education list) and the training schema
+        (personal, personal_projects, education object).
+        """
+        chunks: List[Dict[str, Any]] = []
+        personal = data.get("personal", data)
+
+        # Personal info
+        name = personal.get("name", "Sayed Abdul Karim")
+        role = personal.get("current_role", "")
+        if personal.get("current_company"):
+            role = f"{role} at {personal['current_company']}"
+        chunks.extend(self._pack(
+            [f"I am {name}, also known as {personal.get('nickname', 'Abdul')}, currently working as {role}"],
+            "summary"
+        ))
+
+        contact_fields = [("email", "Email"), ("phone", "Phone"), ("location", "Location"), ("github", "GitHub"), ("portfolio", "Portfolio")]
+        contact = [f"{label}: {personal[key]}" for key, label in contact_fields if personal.get(key)]
+        if contact:
+            chunks.extend(self._pack(contact, "contact", prefix="Contact details: "))
+
+        # Experience: one chunk per job where it fits, with the job header repeated if split
+        for exp in data.get("experience", []):
+            header = f"Work experience: {exp['role']} at {exp['company']}"
+            if exp.get("location"):
+                header += f" ({exp['location']})"
+            header += f" from {exp['duration']}."
+            lines = [exp["description"]] if exp.get("description") else []
+            for proj in exp.get("projects", []):
+                line = f"Project {proj['name']}"
+                if proj.get("description"):
+                    line += f": {proj['description']}"
+                line += f". Tech: {', '.join(proj.get('tech', []))}"
+                for extra in ("platforms", "sites"):
+                    if proj.get(extra):
+                        line += f". {extra.capitalize()}: {', '.join(proj[extra])}"
+                lines.append(line)
+            chunks.extend(self._pack(lines or [""], "experience", prefix=f"{header}\n"))
+
+        # Projects
+        for proj in data.get("projects", []) + data.get("personal_projects", []):
+            lines = [f"{proj['description']}."]
+            if proj.get("tech"):
+                lines.append(f"Built with {', '.join(proj['tech'])}.")
+            if proj.get("highlights"):
+                lines.append(f"Key features: {', '.join(proj['highlights'])}")
+            for component, details in proj.get("components", {}).items():
+                lines.append(f"{component.replace('_', ' ').title()}: {details.get('description', '')}")
+            chunks.extend(self._pack(lines, "projects", prefix=f"Project: {proj['name']} - "))
+
+        # Skills
+        for category, items in data.get("skills", {}).items():
+            chunks.extend(self._pack(
+                [f"My {category.replace('_', '/')} skills include: {', '.join(items)}"], "skills"
+            ))
+
+        # Education
+        education = data.get("education", [])
+        for edu in education if isinstance(education, list) else [education]:
+            school = edu.get("university") or edu.get("institution", "")
+            year = edu.get("year") or edu.get("graduation_year", "")
+            chunks.extend(self._pack([f"Education: {edu['degree']} from {school} in {year}"], "education"))
+
+        return chunks
@@ -0,0 +1,118 @@
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.services.bm25_index import tokenize
+
+SEPARATOR = "\n---\n"
+
+
+class ContextPacker:
+    """
+    Chooses which retrieved chunks go into the prompt. Candidates are cut
+    where their scores fall away from the best hit (adaptive k), then picked
+    by maximal marginal relevance so the PDF chunk and the structured chunk
+    stating the same fact do not both get in, until the token budget
+    (counted with the serving model's tokenizer) is full.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        token_budget: int = 384,
+        mmr_lambda: float = 0.7,
+        min_score: float = 0.5,
+        score_margin: float = 0.15,
+        duplicate_threshold: float = 0.8,
+        keyword_ratio: float = 0.5
+    ):
+        self.count_tokens = count_tokens
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.min_score = min_score
+        self.score_margin = score_margin
+        self.duplicate_threshold = duplicate_threshold
+        self.keyword_ratio = keyword_ratio
+        self._lock = threading.Lock()
+
+        self.packs = 0
+        self.total_candidates = 0
+        self.total_chunks = 0
+        self.total_tokens = 0
+        self.duplicates_dropped = 0
+
+    @staticmethod
+    def _overlap(a: set, b: set) -> float:
+        """Overlap coefficient: 1.0 when one chunk's terms are a subset of the other's"""
+        if not a or not b:
+            return 0.0
+        return len(a & b) / min(len(a), len(b))
+
+    def _candidates(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop weak hits; the cut-off follows the best score instead of a fixed k"""
+        best = max((doc["score"] for doc in documents), default=0.0)
+        floor = max(self.min_score, best - self.score_margin)
+        # Strong exact keyword matches stay eligible even when their dense score is low;
+        # sharing one common term with the query is not enough
+        best_bm25 = max((doc.get("bm25_score", 0.0) for doc in documents), default=0.0)
+        bm25_floor = best_bm25 * self.keyword_ratio
+        return [
+            doc for doc in documents
+            if doc["score"] >= floor or (best_bm25 > 0 and doc.get("bm25_score", 0.0) >= bm25_floor)
+        ]
+
+    def pack(self, documents: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Return (context, selected documents). `documents` must be in
+        retrieval order, best first; that order is used as relevance.
+        """
+        candidates = self._candidates(documents)
+        if not candidates:
+            return "", []
+
+        n = len(candidates)
+        relevance = [(n - i) / n for i in range(n)]
+        terms = [set(tokenize(doc["content"])) for doc in candidates]
+        tokens = [self.count_tokens(doc["content"]) for doc in candidates]
+        separator_tokens = self.count_tokens(SEPARATOR)
+
+        selected: List[int] = []
+        remaining = list(range(n))
+        used = 0
+        duplicates = 0
+        while remaining:
+            def mmr(i: int) -> float:
+                redundancy = max((self._overlap(terms[i], terms[j]) for j in selected), default=0.0)
+                return self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * redundancy
+
+            best = max(remaining, key=mmr)
+            remaining.remove(best)
+
+            if any(self._overlap(terms[best], terms[j]) >= self.duplicate_threshold for j in selected):
+                duplicates += 1
+                continue
+
+            cost = tokens[best] + (separator_tokens if selected else 0)
+            if used + cost > self.token_budget:
+                continue  # a smaller chunk may still fit
+            selected.append(best)
+            used += cost
+
+        with self._lock:
+            self.packs += 1
+            self.total_candidates += len(documents)
+            self.total_chunks += len(selected)
+            self.total_tokens += used
+            self.duplicates_dropped += duplicates
+
+        chosen = [candidates[i] for i in selected]
+        return SEPARATOR.join(doc["content"] for doc in chosen), chosen
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "token_budget": self.token_budget,
+            "packs": self.packs,
+            "avg_candidates": round(self.total_candidates / self.packs, 2) if self.packs else 0.0,
+            "avg_chunks": round(self.total_chunks / self.packs, 2) if self.packs else 0.0,
+            "avg_tokens": round(self.total_tokens / self.packs, 1) if self.packs else 0.0,
+            "duplicates_dropped": self.duplicates_dropped
+        }
@@ -0,0 +1,106 @@
+import hashlib
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+from app.services.bm25_index import tokenize
+
+_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def shingles(text: str, size: int = 2) -> set:
+    """Word n-grams of the content words (stopwords dropped, case folded)"""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHashDeduplicator:
+    """
+    Collapses near-identical chunks before they are embedded. Each chunk gets
+    a MinHash signature over its word shingles; LSH banding proposes
+    candidate pairs, and a pair is merged when the smaller chunk's shingles
+    are (by the MinHash estimate) at least `threshold` contained in the
+    larger one's. Containment rather than plain Jaccard, because a short PDF
+    line restated inside a longer structured chunk is still a duplicate.
+    The longest chunk of each group is kept and records where the group
+    came from.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 64, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make (a * x + b) mod 2^64 a permutation of 64-bit hashes
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, grams: set) -> np.ndarray:
+        if not grams:
+            return np.full(self.num_perm, _MASK, dtype=np.uint64)
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little") for gram in grams],
+            dtype=np.uint64
+        )
+        with np.errstate(over="ignore"):
+            permuted = hashes[:, None] * self._a[None, :] + self._b[None, :]
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def _containment(sig_a: np.ndarray, sig_b: np.ndarray, size_a: int, size_b: int) -> float:
+        """Estimated share of the smaller set contained in the larger: |A n B| / min(|A|, |B|)"""
+        if not size_a or not size_b:
+            return 0.0
+        jaccard = float(np.mean(sig_a == sig_b))
+        # |A n B| = J * |A u B| and |A u B| = (|A| + |B|) / (1 + J)
+        return min(1.0, jaccard * (size_a + size_b) / ((1 + jaccard) * min(size_a, size_b)))
+
+    def deduplicate(self, chunks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return (kept chunks, number removed). Chunks are {"text", "section",
+        "origin"} dicts; kept chunks gain "origins" (sorted, comma-joined) and
+        "duplicates" (how many chunks were folded into them).
+        """
+        if not chunks:
+            return [], 0
+
+        shingle_sets = [shingles(chunk["text"]) for chunk in chunks]
+        sizes = [len(grams) for grams in shingle_sets]
+        signatures = np.stack([self.signature(grams) for grams in shingle_sets])
+        parent = list(range(len(chunks)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows = self.num_perm // self.bands
+        checked = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            for i, band_values in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+                buckets.setdefault(band_values.tobytes(), []).append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        i, j = members[x], members[y]
+                        if (i, j) in checked:
+                            continue
+                        checked.add((i, j))
+                        if self._containment(signatures[i], signatures[j], sizes[i], sizes[j]) >= self.threshold:
+                            parent[find(j)] = find(i)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(chunks)):
+            groups.setdefault(find(i), []).append(i)
+
+        kept = []
+        for members in sorted(groups.values(), key=min):
+            keeper = max(members, key=lambda i: (len(chunks[i]["text"]), -i))
+            origins = sorted({chunks[i].get("origin", "unknown") for i in members})
+            kept.append(dict(chunks[keeper], origins=",".join(origins), duplicates=len(members) - 1))
+        return kept, len(chunks) - len(kept)
@@ -0,0 +1,194 @@
+"""
+Embedding backends for RAGService.
+
+- torch: sentence-transformers on PyTorch (reference implementation)
+- onnx:  the same model exported to ONNX, dynamically quantized to int8 and
+         run with onnxruntime; no torch import at serving time
+
+Export and parity-check the ONNX model once with:
+    python -m app.services.embedding_backend
+"""
+
+import os
+import json
+import inspect
+from typing import List, Union
+import numpy as np
+
+
+def _hub_id(model_name: str) -> str:
+    """sentence-transformers short names live under the sentence-transformers org"""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class SentenceTransformerEmbedder:
+    """fp32 PyTorch sentence-transformers model"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        return self.model.encode(texts, convert_to_numpy=True)
+
+
+class OnnxEmbedder:
+    """int8-quantized ONNX export of a sentence-transformers model (mean pooling + L2 norm)"""
+
+    def __init__(self, model_name: str, onnx_dir: str, num_threads: int = 0, max_length: int = 256, batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(onnx_dir, "model.int8.onnx")
+        tokenizer_path = os.path.join(onnx_dir, "tokenizer.json")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"{model_path} not found - run `python -m app.services.embedding_backend` to export it"
+            )
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.name = f"{model_name}:onnx-int8"
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        inputs = {name: value for name, value in inputs.items() if name in self.input_names}
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        embeddings = np.concatenate([
+            self._encode_batch(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]).astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx(model_name: str, onnx_dir: str) -> str:
+    """Export the transformer to ONNX and quantize its weights to int8"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(_hub_id(model_name))
+    model = AutoModel.from_pretrained(_hub_id(model_name)).eval()
+    tokenizer.backend_tokenizer.save(os.path.join(onnx_dir, "tokenizer.json"))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _Encoder(torch.nn.Module):
+        """Positional-argument wrapper so tracing is independent of forward()'s signature"""
+
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, *inputs):
+            return self.encoder(**dict(zip(input_names, inputs)))[0]
+
+    fp32_path = os.path.join(onnx_dir, "model.onnx")
+    # Newer torch defaults to the dynamo exporter (needs onnxscript); the
+    # TorchScript exporter handles this model fine and works on older torch too
+    export_kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(model),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs
+        )
+
+    int8_path = os.path.join(onnx_dir, "model.int8.onnx")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def check_parity(reference, candidate, texts: List[str]) -> dict:
+    """Compare candidate embeddings against the reference backend by cosine similarity"""
+    ref = reference.encode(texts)
+    cand = candidate.encode(texts)
+    ref = ref / np.linalg.norm(ref, axis=1, keepdims=True)
+    cand = cand / np.linalg.norm(cand, axis=1, keepdims=True)
+    cosines = (ref * cand).sum(axis=1)
+    return {
+        "reference": reference.name,
+        "candidate": candidate.name,
+        "samples": len(texts),
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean())
+    }
+
+
+PARITY_SAMPLES = [
+    "Who are you?",
+    "What's your phone number?",
+    "Tell me about winfieldUnited",
+    "Senior Experience Engineer at Publicis Sapient working on the Patient Portal",
+    "Built with React, Redux Toolkit, TypeScript, Node.js and MongoDB",
+    "Education: BTech from PKACE, Bargarh in 2017",
+]
+
+
+def create_embedder(model_name: str, backend: str = "torch"):
+    """
+    Build the embedding backend selected at startup. The ONNX backend is only
+    used when its recorded parity check passed; otherwise we fall back to torch.
+    """
+    if backend == "onnx":
+        onnx_dir = os.getenv("ONNX_MODEL_DIR", "./models/embeddings-onnx")
+        min_cosine = float(os.getenv("ONNX_PARITY_MIN_COSINE", "0.98"))
+        try:
+            with open(os.path.join(onnx_dir, "parity.json"), 'r') as f:
+                parity = json.load(f)
+            if parity["min_cosine"] < min_cosine:
+                raise ValueError(f"parity min cosine {parity['min_cosine']:.4f} < {min_cosine}")
+            return OnnxEmbedder(model_name, onnx_dir, num_threads=int(os.getenv("ONNX_NUM_THREADS", "0")))
+        except Exception as e:
+            print(f"⚠️ ONNX embedding backend unavailable ({e}), falling back to torch")
+
+    return SentenceTransformerEmbedder(model_name)
+
+
+if __name__ == "__main__":
+    model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    onnx_dir = os.getenv("ONNX_MODEL_DIR", "./models/embeddings-onnx")
+
+    print(f"📦 Exporting {model_name} to {onnx_dir}")
+    export_onnx(model_name, onnx_dir)
+
+    report = check_parity(SentenceTransformerEmbedder(model_name), OnnxEmbedder(model_name, onnx_dir), PARITY_SAMPLES)
+    with open(os.path.join(onnx_dir, "parity.json"), 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Parity vs PyTorch: min cosine {report['min_cosine']:.4f}, mean {report['mean_cosine']:.4f}")
@@ -0,0 +1,53 @@
+import os
+import hashlib
+from typing import Dict, List
+import numpy as np
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's text, used for chunk ids and cache keys"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(model_name: str, text: str) -> str:
+    """Vector store id of a chunk: its text plus the embedding model that encoded it"""
+    return f"chunk_{content_hash(model_name + chr(10) + text)[:32]}"
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model name, text hash).
+    Each embedding lives in its own small .npy file so entries can be
+    added without rewriting the whole cache.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        safe_model = model_name.replace("/", "__").replace(":", "_")
+        self.model_dir = os.path.join(cache_dir, safe_model)
+        os.makedirs(self.model_dir, exist_ok=True)
+
+    def _path(self, text_hash: str) -> str:
+        return os.path.join(self.model_dir, text_hash[:2], f"{text_hash}.npy")
+
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached embeddings for the given hashes (misses are omitted)"""
+        found = {}
+        for text_hash in hashes:
+            path = self._path(text_hash)
+            if os.path.exists(path):
+                try:
+                    found[text_hash] = np.load(path)
+                except Exception:
+                    # Corrupt entry - it will simply be recomputed
+                    pass
+        return found
+
+    def put_many(self, entries: Dict[str, np.ndarray]):
+        """Persist embeddings, writing atomically so readers never see partial files"""
+        for text_hash, embedding in entries.items():
+            path = self._path(text_hash)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(embedding, dtype=np.float32))
+            os.replace(tmp_path, path)
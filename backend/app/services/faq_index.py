@@ -0,0 +1,101 @@
+import os
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+from app.services.query_cache import normalize_query
+
+
+def load_qa_pairs(paths: List[str]) -> List[Dict[str, str]]:
+    """
+    Read {instruction, input, output} pairs from the training data files
+    (a JSON list or JSON lines). Earlier files win when the same question
+    appears more than once.
+    """
+    pairs: List[Dict[str, str]] = []
+    seen = set()
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"⚠️ FAQ source not found: {path}")
+            continue
+
+        with open(path, 'r') as f:
+            if path.endswith(".jsonl"):
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = json.load(f)
+
+        for record in records:
+            question = record.get("instruction", "").strip()
+            if record.get("input"):
+                question = f"{question}\n{record['input'].strip()}"
+            answer = record.get("output", "").strip()
+            key = normalize_query(question)
+            if not question or not answer or key in seen:
+                continue
+            seen.add(key)
+            pairs.append({"question": question, "answer": answer})
+    return pairs
+
+
+class FAQIndex:
+    """
+    Curated question/answer pairs searchable by question embedding.
+    A query whose embedding is within `threshold` cosine similarity of a
+    known question gets that question's answer without retrieval or
+    generation.
+    """
+
+    def __init__(self, threshold: float = 0.9):
+        self.threshold = threshold
+        self.questions: List[str] = []
+        self.answers: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, pairs: List[Dict[str, str]], embed: Callable[[List[str]], np.ndarray]):
+        """Embed all questions; `embed` maps a list of texts to a matrix"""
+        if not pairs:
+            return
+        questions = [pair["question"] for pair in pairs]
+        matrix = np.asarray(embed(questions), dtype=np.float32)
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        self.questions = questions
+        self.answers = [pair["answer"] for pair in pairs]
+        self._matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def lookup(self, embedding) -> Optional[Dict[str, Any]]:
+        """Return the curated answer of the closest question, if close enough"""
+        if self._matrix is None:
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        scores = self._matrix @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+        best = int(np.argmax(scores))
+        with self._lock:
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {
+            "question": self.questions[best],
+            "answer": self.answers[best],
+            "similarity": float(scores[best])
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.questions),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
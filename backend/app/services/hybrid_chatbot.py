@@ -1,7 +1,15 @@
-from typing import Dict, Any, List, AsyncGenerator
+from typing import Dict, Any, List, AsyncGenerator, Tuple
+import os
+import time
 import uuid
 from datetime import datetime
 
+from app.services.semantic_cache import SemanticCache
+from app.services.context_packer import ContextPacker
+from app.services.faq_index import FAQIndex, load_qa_pairs
+from app.services.llm_service import FALLBACK_RESPONSE
+from app.services.chunker import approximate_token_count
+
 class HybridChatbot:
     """
     Hybrid chatbot combining RAG (Retrieval Augmented Generation) 
@@ -12,7 +20,53 @@ class HybridChatbot:
         self.rag_service = rag_service
         self.llm_service = llm_service
         self.conversations = {}  # Store conversation history
+        # Curated answers from the training Q&A pairs, served without retrieval or generation
+        self.faq_enabled = os.getenv("FAQ_ENABLED", "true").lower() == "true"
+        self.faq_sources = os.getenv(
+            "FAQ_SOURCES",
+            "../training/comprehensive_training_data.json,../training/training_data.jsonl"
+        ).split(",")
+        self.faq_index = FAQIndex(threshold=float(os.getenv("FAQ_THRESHOLD", "0.9")))
+        
+        # Retrieve a few extra candidates; the context packer decides how many reach the prompt
+        self.top_k = int(os.getenv("RAG_TOP_K", "6"))
+        self.context_packer = ContextPacker(
+            self._count_tokens,
+            token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "384")),
+            mmr_lambda=float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7")),
+            min_score=float(os.getenv("CONTEXT_MIN_SCORE", "0.5")),
+            score_margin=float(os.getenv("CONTEXT_SCORE_MARGIN", "0.15")),
+            keyword_ratio=float(os.getenv("CONTEXT_KEYWORD_RATIO", "0.5"))
+        )
+        
+        # Paraphrases of already-answered questions skip retrieval and generation
+        self.answer_cache = SemanticCache(
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "256")),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+        )
         
+    async def initialize(self):
+        """Build the FAQ index; call after the RAG service is initialized"""
+        pack = self.rag_service.knowledge_pack
+        if pack is not None:
+            self.llm_service.system_prompt = pack.system_prompt
+        if not self.faq_enabled:
+            return
+        if pack is not None and pack.faq_questions:
+            # Question embeddings come precomputed with the pack
+            self.faq_index.build(pack.faq_pairs(), lambda questions: pack.faq_embeddings)
+            print(f"✅ FAQ index loaded from knowledge pack with {len(self.faq_index)} questions")
+            return
+        try:
+            pairs = load_qa_pairs([path.strip() for path in self.faq_sources if path.strip()])
+            await self.rag_service.indexing_executor.run(
+                self.faq_index.build, pairs, self.rag_service.embed_documents
+            )
+            print(f"✅ FAQ index ready with {len(self.faq_index)} questions")
+        except Exception as e:
+            print(f"⚠️ FAQ index unavailable: {e}")
+    
     async def generate_response(
         self, 
         message: str, 
@@ -20,6 +74,8 @@ class HybridChatbot:
     ) -> Dict[str, Any]:
         """
         Generate response using hybrid approach:
+        0. Answer from the curated FAQ, or reuse the cached answer of a
+           near-identical past question
         1. Search relevant context from resume using RAG
         2. Generate response with fine-tuned model using context
         3. Validate facts before returning
@@ -32,39 +88,72 @@ class HybridChatbot:
             if conversation_id not in self.conversations:
                 self.conversations[conversation_id] = []
             
+            query_embedding = await self._embed_for_lookup(message)
+            
+            # Step 0a: FAQ fast path - curated answer to a known question
+            faq = self.faq_index.lookup(query_embedding) if query_embedding is not None else None
+            if faq is not None:
+                self._record_turn(conversation_id, message, faq["answer"])
+                return {
+                    "answer": faq["answer"],
+                    "conversation_id": conversation_id,
+                    "sources": [{"content": f"FAQ: {faq['question']}", "relevance": faq["similarity"]}]
+                }
+            
+            # Step 0b: Semantic cache - reuse the answer to a near-identical past question
+            cached = None
+            if query_embedding is not None:
+                cached = self.answer_cache.lookup(query_embedding, self.rag_service.index_version)
+            if cached is not None:
+                self._record_turn(conversation_id, message, cached["answer"])
+                return {
+                    "answer": cached["answer"],
+                    "conversation_id": conversation_id,
+                    "sources": cached["sources"]
+                }
+            
             # Step 1: RAG - Search for relevant context
-            relevant_docs = await self.rag_service.search_similar(message, k=3)
+            relevant_docs = await self.rag_service.search_similar(message, k=self.top_k)
             
             # Combine context from retrieved documents
-            context = self._build_context(relevant_docs)
+            context, context_docs = self._build_context(relevant_docs)
             
             # Step 2: Generate response with fine-tuned model
+            generation_started = time.perf_counter()
             response = await self.llm_service.generate(
                 prompt=message,
                 context=context,
                 temperature=0.7
             )
+            generation_seconds = time.perf_counter() - generation_started
             
             # Step 3: Fact validation (ensure accuracy)
             response = self._validate_facts(response)
             
             # Store in conversation history
-            self.conversations[conversation_id].extend([
-                {"role": "user", "content": message, "timestamp": datetime.now()},
-                {"role": "assistant", "content": response, "timestamp": datetime.now()}
-            ])
+            self._record_turn(conversation_id, message, response)
+            
+            sources = [
+                {
+                    "content": doc["content"][:200] + "...",  # Truncate for display
+                    "relevance": doc["score"]
+                } 
+                for doc in context_docs[:2]  # Show top 2 sources
+            ]
+            
+            if response != FALLBACK_RESPONSE and query_embedding is not None:
+                self.answer_cache.store(
+                    query_embedding,
+                    {"answer": response, "sources": sources},
+                    self.rag_service.index_version,
+                    generation_seconds
+                )
             
             # Prepare response
             return {
                 "answer": response,
                 "conversation_id": conversation_id,
-                "sources": [
-                    {
-                        "content": doc["content"][:200] + "...",  # Truncate for display
-                        "relevance": doc["score"]
-                    } 
-                    for doc in relevant_docs[:2]  # Show top 2 sources
-                ]
+                "sources": sources
             }
             
         except Exception as e:
@@ -86,9 +175,16 @@ class HybridChatbot:
             if not conversation_id:
                 conversation_id = str(uuid.uuid4())
             
+            # Known questions get their curated answer in one piece
+            query_embedding = await self._embed_for_lookup(message)
+            faq = self.faq_index.lookup(query_embedding) if query_embedding is not None else None
+            if faq is not None:
+                yield faq["answer"]
+                return
+            
             # RAG search
-            relevant_docs = await self.rag_service.search_similar(message, k=3)
-            context = self._build_context(relevant_docs)
+            relevant_docs = await self.rag_service.search_similar(message, k=self.top_k)
+            context, _ = self._build_context(relevant_docs)
             
             # Stream from LLM
             async for chunk in self.llm_service.generate_stream(
@@ -106,17 +202,29 @@ class HybridChatbot:
         except Exception as e:
             yield f"Error: {str(e)}"
     
-    def _build_context(self, documents: List[Dict[str, Any]]) -> str:
-        """Build context string from retrieved documents"""
+    async def _embed_for_lookup(self, message: str):
+        """Query embedding for the FAQ and answer-cache lookups, or None if embedding
+        fails - those are shortcuts, so the question still goes to retrieval and the LLM"""
+        try:
+            return await self.rag_service.embed_query(message)
+        except Exception as e:
+            print(f"⚠️ Query embedding failed, skipping FAQ and answer cache: {e}")
+            return None
+    
+    def _build_context(self, documents: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Build a token-budgeted, de-duplicated context string from retrieved documents.
+        Returns the context and the documents it was built from."""
         if not documents:
-            return ""
-        
-        context_parts = []
-        for doc in documents:
-            if doc["score"] > 0.5:  # Only include relevant documents
-                context_parts.append(doc["content"])
+            return "", []
         
-        return "\n---\n".join(context_parts)
+        return self.context_packer.pack(documents)
+    
+    def _count_tokens(self, text: str) -> int:
+        """Token count in the serving model's tokenizer (shared with the chunker)"""
+        chunker = self.rag_service.chunker
+        if chunker is None:
+            return approximate_token_count(text)
+        return chunker.count_tokens(text)
     
     def _validate_facts(self, response: str) -> str:
         """
@@ -167,6 +275,25 @@ class HybridChatbot:
         
         return chunk
     
+    def _record_turn(self, conversation_id: str, message: str, response: str):
+        """Append a user/assistant exchange to the conversation history"""
+        self.conversations[conversation_id].extend([
+            {"role": "user", "content": message, "timestamp": datetime.now()},
+            {"role": "assistant", "content": response, "timestamp": datetime.now()}
+        ])
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate and saved generation time of the semantic answer cache"""
+        return self.answer_cache.stats()
+    
+    def get_faq_stats(self) -> Dict[str, Any]:
+        """Size and hit rate of the FAQ fast path"""
+        return self.faq_index.stats()
+    
+    def get_context_stats(self) -> Dict[str, Any]:
+        """Chunks and tokens the context packer puts into prompts"""
+        return self.context_packer.stats()
+    
     def get_conversation_history(self, conversation_id: str) -> List[Dict[str, Any]]:
         """Retrieve conversation history"""
         return self.conversations.get(conversation_id, [])
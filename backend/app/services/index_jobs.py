@@ -0,0 +1,151 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class IndexJob:
+    """One background index build and its progress"""
+
+    def __init__(self, collection: str, file_path: str):
+        self.id = uuid.uuid4().hex
+        self.collection = collection
+        self.file_path = file_path
+        self.status = "queued"  # queued | running | succeeded | failed
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "collection": self.collection,
+            "file_path": self.file_path,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class IndexJobManager:
+    """
+    Runs RAGService.index_resume as background jobs. At most one build runs
+    per collection; a request arriving while an identical build is still
+    queued joins that job instead of queueing another. Progress is pushed
+    to subscribers (the SSE endpoint) as it happens.
+    """
+
+    def __init__(self, rag_service, max_history: int = 100):
+        self.rag_service = rag_service
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, IndexJob]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._subscribers: Dict[str, set] = {}
+        self._tasks = set()
+
+    def submit(self, file_path: str, collection: str = "resume") -> IndexJob:
+        """Queue a build and return its job immediately"""
+        for job in self._jobs.values():
+            if job.collection == collection and job.file_path == file_path and job.status == "queued":
+                return job
+
+        job = IndexJob(collection, file_path)
+        self._jobs[job.id] = job
+        self._trim_history()
+
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[IndexJob]:
+        return self._jobs.get(job_id)
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's state now and after every change, until it finishes"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            # Follow the published snapshots, not the live job: a lagging consumer
+            # must still receive every queued update and the final status
+            snapshot = job.to_dict()
+            yield snapshot
+            while snapshot["status"] not in TERMINAL_STATUSES:
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            self._subscribers.get(job_id, set()).discard(queue)
+
+    async def wait(self, job_id: str) -> Optional[IndexJob]:
+        """Wait for a job to finish and return it"""
+        async for _ in self.events(job_id):
+            pass
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: IndexJob):
+        lock = self._locks.setdefault(job.collection, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            job.status = "running"
+            job.started_at = time.time()
+            self._publish(job)
+
+            def progress(stage: str, fraction: float):
+                # Called from the indexing thread
+                loop.call_soon_threadsafe(self._update, job, stage, fraction)
+
+            try:
+                job.result = await self.rag_service.index_resume(job.file_path, progress=progress)
+                job.status = "succeeded"
+                job.stage = "done"
+                job.progress = 1.0
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._publish(job)
+
+    def _update(self, job: IndexJob, stage: str, fraction: float):
+        if job.finished:
+            return
+        job.stage = stage
+        job.progress = fraction
+        self._publish(job)
+
+    def _publish(self, job: IndexJob):
+        snapshot = job.to_dict()
+        for queue in self._subscribers.get(job.id, ()):
+            queue.put_nowait(snapshot)
+
+    def _trim_history(self):
+        while len(self._jobs) > self.max_history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest_id]
+            self._subscribers.pop(oldest_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "succeeded", "failed")}
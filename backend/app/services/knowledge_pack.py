@@ -0,0 +1,284 @@
+"""
+Compiled persona knowledge pack.
+
+One versioned binary file holding everything the serving processes would
+otherwise rebuild at startup from resume_structured.json and the training
+Q&A pairs: section-tagged chunks with their embeddings, the BM25 postings,
+the FAQ questions/answers with their embeddings, and the system prompt
+with its token ids in the serving model's tokenizer.
+
+Layout: 8-byte magic, uint32 format, uint32 reserved, uint64 header size,
+a JSON header, then 64-byte aligned little-endian arrays described by the
+header. Arrays are read straight from a memory map, so loading a pack
+costs a JSON parse and no embedding work.
+
+    python -m app.services.knowledge_pack --input ./data/resume_structured.json --output ./persona.pack
+"""
+
+import os
+import mmap
+import json
+import time
+import struct
+import hashlib
+import argparse
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from app.services.bm25_index import BM25Index
+from app.services.chunker import ResumeChunker, create_chunker, load_tokenizer, serving_tokenizer_candidates
+from app.services.embedding_cache import content_hash, chunk_id
+from app.services.faq_index import load_qa_pairs
+
+MAGIC = b"PERSONA\0"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sIIQ")
+ALIGNMENT = 64
+
+SECTION_TITLES = {
+    "summary": "PROFILE",
+    "contact": "CONTACT",
+    "experience": "EXPERIENCE",
+    "projects": "PROJECTS",
+    "skills": "SKILLS",
+    "education": "EDUCATION"
+}
+
+
+class KnowledgePackError(Exception):
+    pass
+
+
+class KnowledgePack:
+    """Read-only view of a compiled pack; arrays are backed by the memory map"""
+
+    def __init__(self, path: str, header: Dict[str, Any], buffer: mmap.mmap, data_offset: int):
+        self.path = path
+        self.header = header
+        self._buffer = buffer
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            shape = tuple(spec["shape"])
+            if not int(np.prod(shape)):
+                # Empty arrays occupy no bytes and may sit at the end of the file
+                arrays[name] = np.zeros(shape, dtype=np.dtype(spec["dtype"]))
+                continue
+            arrays[name] = np.frombuffer(
+                buffer,
+                dtype=np.dtype(spec["dtype"]),
+                count=int(np.prod(shape)),
+                offset=data_offset + spec["offset"]
+            ).reshape(shape)
+
+        self.version: str = header["version"]
+        self.embedding_model: str = header["embedding_model"]
+        self.chunk_ids: List[str] = header["chunks"]["ids"]
+        self.chunk_texts: List[str] = header["chunks"]["documents"]
+        self.chunk_metadatas: List[Dict[str, Any]] = header["chunks"]["metadatas"]
+        self.embeddings: np.ndarray = arrays["embeddings"]
+        self.faq_questions: List[str] = header["faq"]["questions"]
+        self.faq_answers: List[str] = header["faq"]["answers"]
+        self.faq_embeddings: np.ndarray = arrays["faq_embeddings"]
+        self.system_prompt: str = header["system_prompt"]
+        self.system_prompt_ids: np.ndarray = arrays["system_prompt_ids"]
+        self.persona_prompt: str = header["persona_prompt"]
+        self._bm25_data = header["bm25"]
+        self._row_by_hash = {meta["content_hash"]: row for row, meta in enumerate(self.chunk_metadatas)}
+
+    @classmethod
+    def load(cls, path: str) -> "KnowledgePack":
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < PREAMBLE.size:
+            raise KnowledgePackError(f"{path} is too small to be a knowledge pack")
+        magic, format_version, _, header_size = PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise KnowledgePackError(f"{path} is not a knowledge pack")
+        if format_version != FORMAT_VERSION:
+            raise KnowledgePackError(f"{path} has format {format_version}, expected {FORMAT_VERSION}")
+        header = json.loads(bytes(buffer[PREAMBLE.size:PREAMBLE.size + header_size]))
+        data_offset = _aligned(PREAMBLE.size + header_size)
+        if data_offset + header.get("data_size", 0) > len(buffer):
+            raise KnowledgePackError(f"{path} is truncated")
+        return cls(path, header, buffer, data_offset)
+
+    def bm25_index(self) -> BM25Index:
+        return BM25Index.from_dict(self._bm25_data)
+
+    def faq_pairs(self) -> List[Dict[str, str]]:
+        return [{"question": q, "answer": a} for q, a in zip(self.faq_questions, self.faq_answers)]
+
+    def embeddings_for(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Packed embeddings for the given chunk content hashes (misses are omitted)"""
+        return {text_hash: self.embeddings[self._row_by_hash[text_hash]] for text_hash in hashes if text_hash in self._row_by_hash}
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "created_at": self.header["created_at"],
+            "embedding_model": self.embedding_model,
+            "chunks": len(self.chunk_ids),
+            "faq": len(self.faq_questions),
+            "system_prompt_tokens": int(len(self.system_prompt_ids))
+        }
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def persona_prompt(system_prompt: str, chunks: List[Dict[str, Any]]) -> str:
+    """System prompt followed by the resume facts grouped by section"""
+    parts = [system_prompt.strip()]
+    for section, title in SECTION_TITLES.items():
+        lines = [chunk["text"] for chunk in chunks if chunk["section"] == section]
+        if lines:
+            parts.append(f"{title}:\n" + "\n".join(f"- {line}" for line in lines))
+    return "\n\n".join(parts)
+
+
+def build_knowledge_pack(
+    output_path: str,
+    structured_data: Dict[str, Any],
+    qa_pairs: List[Dict[str, str]],
+    embedder,
+    chunker: ResumeChunker,
+    system_prompt: str,
+    tokenizer=None,
+    source_hash: str = ""
+) -> Dict[str, Any]:
+    """Chunk, embed and index the persona data and write it as one pack file"""
+    chunks = []
+    seen = set()
+    for chunk in chunker.chunk_structured(structured_data):
+        if chunk["text"] not in seen:
+            seen.add(chunk["text"])
+            chunks.append(chunk)
+
+    texts = [chunk["text"] for chunk in chunks]
+    ids = [chunk_id(embedder.name, text) for text in texts]
+    metadatas = [
+        {
+            "source": "resume",
+            "section": chunk["section"],
+            "chunk_id": i,
+            "content_hash": content_hash(chunk["text"]),
+            "embedding_model": embedder.name
+        }
+        for i, chunk in enumerate(chunks)
+    ]
+    embeddings = np.asarray(embedder.encode(texts), dtype=np.float32)
+
+    bm25 = BM25Index()
+    bm25.build(ids, texts, metadatas)
+
+    questions = [pair["question"] for pair in qa_pairs]
+    faq_embeddings = (
+        np.asarray(embedder.encode(questions), dtype=np.float32)
+        if questions else np.zeros((0, embeddings.shape[1]), dtype=np.float32)
+    )
+    prompt_ids = np.asarray(
+        tokenizer.encode(system_prompt, add_special_tokens=False).ids if tokenizer else [],
+        dtype=np.int32
+    )
+
+    arrays = {"embeddings": embeddings, "faq_embeddings": faq_embeddings, "system_prompt_ids": prompt_ids}
+    specs, offset = {}, 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        specs[name] = {"offset": offset, "dtype": array.dtype.newbyteorder("<").str, "shape": list(array.shape)}
+        offset += array.nbytes
+
+    version = hashlib.sha256(
+        f"{FORMAT_VERSION}\n{embedder.name}\n{chunker.max_tokens}/{chunker.overlap_tokens}\n{source_hash}".encode()
+    ).hexdigest()[:16]
+    header = {
+        "version": version,
+        "created_at": time.time(),
+        "embedding_model": embedder.name,
+        "chunks": {"ids": ids, "documents": texts, "metadatas": metadatas},
+        "bm25": bm25.to_dict(),
+        "faq": {"questions": questions, "answers": [pair["answer"] for pair in qa_pairs]},
+        "system_prompt": system_prompt,
+        "persona_prompt": persona_prompt(system_prompt, chunks),
+        "arrays": specs,
+        "data_size": _aligned(offset)
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = _aligned(PREAMBLE.size + len(header_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_offset + specs[name]["offset"])
+            f.write(np.ascontiguousarray(array).astype(specs[name]["dtype"], copy=False).tobytes())
+        # Seeks past the end do not extend the file; fix its length explicitly
+        f.truncate(data_offset + header["data_size"])
+
+    # Never replace a working pack with one that does not load
+    try:
+        KnowledgePack.load(tmp_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+
+    return {"path": output_path, "version": version, "chunks": len(ids), "faq": len(questions), "system_prompt_tokens": int(len(prompt_ids))}
+
+
+def load_knowledge_pack(path: Optional[str], embedding_model: Optional[str] = None) -> Optional[KnowledgePack]:
+    """Load the pack at `path` if it exists and matches the embedding model, else None"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        pack = KnowledgePack.load(path)
+    except (KnowledgePackError, OSError, ValueError) as e:
+        print(f"⚠️ Ignoring knowledge pack {path}: {e}")
+        return None
+    if embedding_model and pack.embedding_model != embedding_model:
+        print(f"⚠️ Ignoring knowledge pack {path}: built for {pack.embedding_model}, serving {embedding_model}")
+        return None
+    return pack
+
+
+if __name__ == "__main__":
+    from app.services.embedding_backend import create_embedder
+    from app.services.llm_service import SYSTEM_PROMPT
+
+    parser = argparse.ArgumentParser(description="Compile the persona knowledge pack")
+    parser.add_argument("--input", default=os.getenv("RESUME_JSON_PATH", "./data/resume_structured.json"))
+    parser.add_argument("--qa", default=os.getenv(
+        "FAQ_SOURCES", "../training/comprehensive_training_data.json,../training/training_data.jsonl"
+    ))
+    parser.add_argument("--output", default=os.getenv("KNOWLEDGE_PACK", "./persona.pack"))
+    args = parser.parse_args()
+
+    with open(args.input, 'rb') as f:
+        raw = f.read()
+    qa_paths = [path.strip() for path in args.qa.split(",") if path.strip()]
+    source_hash = hashlib.sha256(raw)
+    for path in qa_paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                source_hash.update(f.read())
+
+    embedder = create_embedder(
+        os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+        os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    )
+    result = build_knowledge_pack(
+        args.output,
+        json.loads(raw),
+        load_qa_pairs(qa_paths),
+        embedder,
+        create_chunker(),
+        SYSTEM_PROMPT,
+        tokenizer=load_tokenizer(serving_tokenizer_candidates()),
+        source_hash=source_hash.hexdigest()
+    )
+    print(f"✅ Wrote knowledge pack: {result}")
@@ -0,0 +1,77 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class LlamaPool:
+    """
+    A fixed set of llama.cpp `Llama` instances over one GGUF file. A Llama
+    object holds a single KV cache and is not safe to share, so each
+    generation checks one out for its duration. The weights are mmapped, so
+    every instance maps the same pages and only the per-instance context
+    (KV cache, scratch buffers) costs extra memory. Size the pool so that
+    size * n_threads roughly matches the physical cores.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        size: int = 1,
+        n_ctx: int = 2048,
+        n_threads: int = None,
+        n_batch: int = 512,
+        n_gpu_layers: int = -1,
+        use_mlock: bool = False
+    ):
+        from llama_cpp import Llama
+
+        self.model_path = model_path
+        self.size = max(1, size)
+        self.n_threads = n_threads or max(1, (os.cpu_count() or 1) // self.size)
+        self.n_batch = n_batch
+        self.use_mlock = use_mlock
+        self._idle: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.generations = 0
+
+        for _ in range(self.size):
+            self._idle.put(Llama(
+                model_path=model_path,
+                n_ctx=n_ctx,
+                n_threads=self.n_threads,
+                n_batch=n_batch,
+                n_gpu_layers=n_gpu_layers,
+                use_mmap=True,
+                use_mlock=use_mlock,
+                verbose=False
+            ))
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Check out an idle instance, blocking the calling thread until one is free"""
+        llm = self._idle.get()
+        with self._lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.generations += 1
+        try:
+            yield llm
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._idle.put(llm)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "generations": self.generations,
+            "n_threads": self.n_threads,
+            "n_batch": self.n_batch,
+            "mlock": self.use_mlock
+        }
@@ -1,18 +1,48 @@
 import os
 import replicate
-from typing import Dict, Any, AsyncGenerator
+from typing import Dict, Any, AsyncGenerator, List
 import json
 from huggingface_hub import InferenceClient
 from dotenv import load_dotenv
+from app.services.ollama_client import get_ollama_client
+from app.services.bounded_executor import BoundedExecutor
+from app.services.async_bridge import iterate_in_thread
+from app.services.llama_pool import LlamaPool
+from app.services.prefix_cache import PrefixKVCache, crop_cache, prefix_boundaries
 
 load_dotenv()
 
+FALLBACK_RESPONSE = "I apologize, but I'm having trouble generating a response right now. Please try again."
+
+SYSTEM_PROMPT = """You are Sayed Abdul Karim, also known as Abdul, a Senior Experience Engineer at Publicis Sapient. 
+        You're friendly, professional, and knowledgeable about software development.
+        When asked about yourself, speak in first person.
+        Be concise but informative in your responses."""
+
 class LLMService:
     def __init__(self):
         self.is_initialized = False
         self.model_type = os.getenv("MODEL_TYPE", "replicate")  # replicate or huggingface
         self.client = None
         self.model_name = None
+        self.system_prompt = SYSTEM_PROMPT
+        self.ollama = None
+        self.llama_pool = None
+        self.llama_pool_size = int(os.getenv("LLAMA_POOL_SIZE", "1"))
+        
+        # Blocking in-process generation (llama.cpp, local transformers) runs off
+        # the event loop; llama.cpp gets one worker per pooled instance
+        default_workers = self.llama_pool_size if self.model_type == "llamacpp" else 1
+        self.generation_executor = BoundedExecutor(
+            "llm-generation",
+            max_workers=int(os.getenv("LLM_WORKERS", str(default_workers))),
+            max_queue=int(os.getenv("LLM_QUEUE_SIZE", "16"))
+        )
+        
+        # past_key_values of shared prompt prefixes (system prompt, + context) for local transformers
+        self.prefix_cache = None
+        if os.getenv("PREFIX_CACHE_ENABLED", "true").lower() == "true":
+            self.prefix_cache = PrefixKVCache(max_bytes=int(float(os.getenv("PREFIX_CACHE_MAX_MB", "256")) * 1024 * 1024))
         
     async def initialize(self):
         """Initialize the LLM service with fine-tuned model"""
@@ -20,19 +50,25 @@ class LLMService:
             if self.model_type == "ollama":
                 # Use Ollama for local testing
                 self.model_name = os.getenv("OLLAMA_MODEL", "abdul-llama")
+                self.ollama = get_ollama_client()
                 self.is_initialized = True
                 print(f"✅ LLM Service initialized with Ollama: {self.model_name}")
                 
             elif self.model_type == "llamacpp":
                 # Use llama-cpp-python for direct GGUF loading
-                from llama_cpp import Llama
-                self.model = Llama(
-                    model_path=os.getenv("MODEL_PATH", "./models/abdul-llama.gguf"),
-                    n_ctx=2048,
-                    n_gpu_layers=-1,  # Use all available GPU layers
+                n_threads = os.getenv("LLAMA_N_THREADS")
+                self.llama_pool = LlamaPool(
+                    os.getenv("MODEL_PATH", "./models/abdul-llama.gguf"),
+                    size=self.llama_pool_size,
+                    n_ctx=int(os.getenv("LLAMA_N_CTX", "2048")),
+                    n_threads=int(n_threads) if n_threads else None,
+                    n_batch=int(os.getenv("LLAMA_N_BATCH", "512")),
+                    n_gpu_layers=int(os.getenv("LLAMA_N_GPU_LAYERS", "-1")),  # -1 uses all available GPU layers
+                    use_mlock=os.getenv("LLAMA_MLOCK", "false").lower() == "true"
                 )
+                self.model_name = os.path.basename(self.llama_pool.model_path)
                 self.is_initialized = True
-                print("✅ LLM Service initialized with llama.cpp")
+                print(f"✅ LLM Service initialized with llama.cpp ({self.llama_pool.size} instances)")
                 
             elif self.model_type == "replicate":
                 # Use Replicate for hosted fine-tuned model
@@ -94,7 +130,7 @@ class LLMService:
         except Exception as e:
             print(f"Error generating response: {e}")
             # Fallback response
-            return "I apologize, but I'm having trouble generating a response right now. Please try again."
+            return FALLBACK_RESPONSE
     
     async def generate_stream(
         self, 
@@ -106,7 +142,13 @@ class LLMService:
         try:
             full_prompt = self._construct_prompt(prompt, context)
             
-            if self.model_type == "replicate":
+            if self.model_type == "ollama":
+                async for chunk in self._stream_ollama(full_prompt, temperature):
+                    yield chunk
+            elif self.model_type == "llamacpp":
+                async for chunk in self._stream_llamacpp(full_prompt, temperature):
+                    yield chunk
+            elif self.model_type == "replicate":
                 async for chunk in self._stream_replicate(full_prompt, temperature):
                     yield chunk
             elif self.model_type == "huggingface":
@@ -119,12 +161,22 @@ class LLMService:
         except Exception as e:
             yield f"Error: {str(e)}"
     
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Queue depth and timings of in-process generation"""
+        stats = self.generation_executor.stats()
+        if self.llama_pool is not None:
+            stats["llama_pool"] = self.llama_pool.stats()
+        if self.prefix_cache is not None and self.model_type not in ("ollama", "llamacpp", "replicate", "huggingface"):
+            stats["prefix_cache"] = self.prefix_cache.stats()
+        return stats
+    
+    def shutdown(self):
+        """Stop the generation workers"""
+        self.generation_executor.shutdown()
+    
     def _construct_prompt(self, user_query: str, context: str) -> str:
         """Construct prompt with persona and context"""
-        system_prompt = """You are Sayed Abdul Karim, also known as Abdul, a Senior Experience Engineer at Publicis Sapient. 
-        You're friendly, professional, and knowledgeable about software development.
-        When asked about yourself, speak in first person.
-        Be concise but informative in your responses."""
+        system_prompt = self.system_prompt
         
         if context:
             prompt = f"""{system_prompt}
@@ -144,22 +196,9 @@ Sarim:"""
     
     async def _generate_ollama(self, prompt: str, temperature: float) -> str:
         """Generate using Ollama local server"""
-        import requests
         try:
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "temperature": temperature,
-                    "stream": False
-                },
-                timeout=30
-            )
-            if response.status_code == 200:
-                return response.json()["response"]
-            else:
-                raise Exception(f"Ollama error: {response.text}")
+            result = await self.ollama.generate(self.model_name, prompt, {"temperature": temperature})
+            return result["response"]
         except Exception as e:
             print(f"Ollama generation error: {e}")
             raise e
@@ -167,18 +206,21 @@ Sarim:"""
     async def _generate_llamacpp(self, prompt: str, temperature: float) -> str:
         """Generate using llama.cpp"""
         try:
-            output = self.model(
-                prompt,
-                max_tokens=256,
-                temperature=temperature,
-                stop=["User:", "\n\n"],
-                echo=False
-            )
-            return output['choices'][0]['text'].strip()
+            return await self.generation_executor.run(self._generate_llamacpp_sync, prompt, temperature)
         except Exception as e:
             print(f"Llama.cpp generation error: {e}")
             raise e
     
+    def _generate_llamacpp_sync(self, prompt: str, temperature: float) -> str:
+        """Blocking llama.cpp completion on a pooled instance"""
+        with self.llama_pool.acquire() as llm:
+            output = llm(prompt, **self._llamacpp_params(temperature))
+        return output['choices'][0]['text'].strip()
+    
+    @staticmethod
+    def _llamacpp_params(temperature: float) -> Dict[str, Any]:
+        return {"max_tokens": 256, "temperature": temperature, "stop": ["User:", "\n\n"], "echo": False}
+    
     async def _generate_replicate(self, prompt: str, temperature: float) -> str:
         """Generate using Replicate API"""
         output = self.client.run(
@@ -208,7 +250,20 @@ Sarim:"""
     
     async def _generate_local(self, prompt: str, temperature: float) -> str:
         """Generate using local model"""
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        return await self.generation_executor.run(self._generate_local_sync, prompt, temperature)
+    
+    def _generate_local_sync(self, prompt: str, temperature: float, streamer=None) -> str:
+        """Blocking model.generate; runs on the generation executor.
+        Resumes from the longest cached prompt prefix and caches new prefixes."""
+        import torch
+        
+        use_prefix_cache = self.prefix_cache is not None and self.tokenizer.is_fast
+        inputs = self.tokenizer(prompt, return_tensors="pt", return_offsets_mapping=use_prefix_cache)
+        offsets = inputs.pop("offset_mapping")[0].tolist() if use_prefix_cache else None
+        inputs = inputs.to(self.model.device)
+        ids = inputs["input_ids"][0].tolist()
+        
+        cached_length, past = self.prefix_cache.lookup(ids) if use_prefix_cache else (0, None)
         
         with torch.no_grad():
             outputs = self.model.generate(
@@ -217,13 +272,47 @@ Sarim:"""
                 temperature=temperature,
                 do_sample=True,
                 top_p=0.9,
-                repetition_penalty=1.1
+                repetition_penalty=1.1,
+                streamer=streamer,
+                past_key_values=past,
+                return_dict_in_generate=use_prefix_cache
             )
         
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        # Remove the prompt from response
-        response = response[len(prompt):].strip()
-        return response
+        sequences = outputs.sequences if use_prefix_cache else outputs
+        if use_prefix_cache and outputs.past_key_values is not None:
+            # Prompt positions of the returned cache are the prefill of this prompt,
+            # so every uncached prefix boundary is a crop of it
+            for boundary in prefix_boundaries(offsets, self._prefix_positions(prompt), len(ids)):
+                if boundary > cached_length:
+                    self.prefix_cache.insert(ids[:boundary], crop_cache(outputs.past_key_values, boundary))
+        
+        # Decode only the generated tokens, not the prompt
+        return self.tokenizer.decode(sequences[0][len(ids):], skip_special_tokens=True).strip()
+    
+    def _prefix_positions(self, prompt: str) -> List[int]:
+        """Character offsets where reusable prefixes of a _construct_prompt prompt end"""
+        positions = [len(self.system_prompt)]
+        user_turn = prompt.rfind("\nUser: ")
+        if user_turn > 0:
+            positions.append(user_turn)
+        return positions
+    
+    async def _stream_ollama(self, prompt: str, temperature: float) -> AsyncGenerator[str, None]:
+        """Stream from Ollama's NDJSON output as tokens are generated"""
+        async for chunk in self.ollama.stream_generate(self.model_name, prompt, {"temperature": temperature}):
+            yield chunk
+    
+    async def _stream_llamacpp(self, prompt: str, temperature: float) -> AsyncGenerator[str, None]:
+        """Stream from llama.cpp on a pooled instance as tokens are sampled"""
+        def produce(channel):
+            with self.llama_pool.acquire() as llm:
+                for event in llm(prompt, stream=True, **self._llamacpp_params(temperature)):
+                    text = event['choices'][0]['text']
+                    if text:
+                        channel.send(text)
+        
+        async for chunk in iterate_in_thread(produce, run=self.generation_executor.run):
+            yield chunk
     
     async def _stream_replicate(self, prompt: str, temperature: float) -> AsyncGenerator[str, None]:
         """Stream from Replicate"""
@@ -250,12 +339,24 @@ Sarim:"""
             yield token
     
     async def _stream_local(self, prompt: str, temperature: float) -> AsyncGenerator[str, None]:
-        """Stream from local model"""
-        # For local model, we'll generate full response and yield in chunks
-        response = await self._generate_local(prompt, temperature)
+        """Stream from local model as tokens are decoded"""
+        from transformers import TextStreamer
+        
+        tokenizer = self.tokenizer
+        
+        class ChannelStreamer(TextStreamer):
+            """Forwards each finalized piece of text to the async consumer"""
+            
+            def __init__(self, channel):
+                super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+                self.channel = channel
+            
+            def on_finalized_text(self, text: str, stream_end: bool = False):
+                if text:
+                    self.channel.send(text)
+        
+        def produce(channel):
+            self._generate_local_sync(prompt, temperature, streamer=ChannelStreamer(channel))
         
-        # Simulate streaming by yielding words
-        words = response.split()
-        for word in words:
-            yield word + " "
-            await asyncio.sleep(0.05)  # Small delay to simulate streaming
\ No newline at end of file
+        async for chunk in iterate_in_thread(produce, run=self.generation_executor.run):
+            yield chunk
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+import httpx
+
+
+class OllamaClient:
+    """
+    One pooled async HTTP client for every Ollama call. Connections are
+    kept alive between requests, connect and read timeouts are separate (a
+    long generation is not a dead server), and the pool caps how many
+    generations run against the server at once. `keep_alive` is passed on
+    each request so Ollama keeps the model loaded between chats.
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        keep_alive: str = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        max_connections: int = None
+    ):
+        self.base_url = (base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")).rstrip("/")
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+        connect_timeout = connect_timeout or float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+        read_timeout = read_timeout or float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))
+        max_connections = max_connections or int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+
+        self.timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout, write=connect_timeout, pool=read_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    def _payload(self, model: str, prompt: str, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": options or {}
+        }
+
+    async def generate(self, model: str, prompt: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Non-streaming /api/generate; raises httpx.HTTPError on transport or status errors"""
+        response = await self.client.post("/api/generate", json=self._payload(model, prompt, options, False))
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_generate(self, model: str, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Streaming /api/generate: yields response fragments as Ollama emits its NDJSON lines"""
+        async with self.client.stream("POST", "/api/generate", json=self._payload(model, prompt, options, True)) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if "error" in event:
+                    raise RuntimeError(f"Ollama error: {event['error']}")
+                if event.get("response"):
+                    yield event["response"]
+                if event.get("done"):
+                    break
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_shared_client: Optional[OllamaClient] = None
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide client, so every caller shares one connection pool"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = OllamaClient()
+    return _shared_client
+
+
+async def close_ollama_client():
+    if _shared_client is not None:
+        await _shared_client.aclose()
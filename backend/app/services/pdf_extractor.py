@@ -0,0 +1,219 @@
+"""
+Shared PDF text extraction stage used by RAGService and the training scripts.
+Only depends on PyPDF2 and the standard library so it can be imported from
+outside the backend app.
+"""
+
+import os
+import time
+import json
+import unicodedata
+import hashlib
+import multiprocessing
+from typing import Iterator, List, Optional
+
+import PyPDF2
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+# Bump when the page cache key changes so stale entries are never reused
+CACHE_KEY_VERSION = "3"
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be extracted within its time/memory limits"""
+
+
+def _limit_worker_memory(limit_bytes: int):
+    """Pool initializer: cap the address space of an extraction worker"""
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    except (ImportError, ValueError, OSError):
+        # Not supported on this platform - rely on the time limit only
+        pass
+
+
+def _extract_page(file_path: str, page_num: int) -> str:
+    """Worker: extract the text of a single page, NFKC-normalized (ligatures become letters)"""
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return unicodedata.normalize("NFKC", reader.pages[page_num].extract_text() or "")
+
+
+def _hash_object(obj, digest, seen: set):
+    """Feed a PDF object into `digest`, following references (each once) and raw stream bytes"""
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        digest.update(f"R{ref}".encode())
+        if ref in seen:
+            return
+        seen.add(ref)
+        obj = obj.get_object()
+
+    if isinstance(obj, DictionaryObject):
+        digest.update(b"<<")
+        for key in sorted(obj.keys()):
+            if key == "/Parent":
+                continue  # points back up the page tree
+            digest.update(str(key).encode())
+            _hash_object(obj.raw_get(key), digest, seen)
+        digest.update(b">>")
+        if isinstance(obj, StreamObject):
+            # Encoded bytes identify the stream without decompressing it
+            digest.update(getattr(obj, "_data", b"") or b"")
+    elif isinstance(obj, ArrayObject):
+        digest.update(b"[")
+        for item in obj:
+            _hash_object(item, digest, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode())
+
+
+def _page_hashes(file_path: str) -> List[str]:
+    """
+    Worker: key each page by its content stream together with its
+    /Resources (fonts, Form XObjects, images), so pages drawing the same
+    stream against different resources never share a cache entry.
+    """
+    hashes = []
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            digest = hashlib.sha256(CACHE_KEY_VERSION.encode())
+            contents = page.get_contents()
+            digest.update(contents.get_data() if contents is not None else b"")
+            _hash_object(page.get("/Resources"), digest, set())
+            hashes.append(digest.hexdigest())
+    return hashes
+
+
+class PDFExtractor:
+    """
+    Extracts PDF text page by page:
+    - the file is only ever parsed inside the process pool, page keys included
+    - uncached pages are parsed in parallel in the same pool
+    - per-page text is cached on disk by a hash of the page content and resources
+    - each file gets a wall-clock budget and workers get a memory cap,
+      so a pathological PDF fails fast instead of hanging the caller
+    - pages are yielded in order as soon as they are ready
+
+    Workers are started with the spawn method, which re-imports the
+    caller's main module: scripts using this class must keep their entry
+    point under `if __name__ == "__main__":`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None
+    ):
+        self.cache_dir = cache_dir or os.getenv("PDF_PAGE_CACHE_DIR", "./pdf_page_cache")
+        self.max_workers = max_workers or int(os.getenv("PDF_WORKERS", "4"))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("PDF_TIMEOUT_SECONDS", "60"))
+        self.memory_limit_mb = memory_limit_mb or int(os.getenv("PDF_MEMORY_LIMIT_MB", "1024"))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, page_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{page_hash}.txt")
+
+    def _read_cache(self, page_hash: str) -> Optional[str]:
+        path = self._cache_path(page_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _write_cache(self, page_hash: str, text: str):
+        path = self._cache_path(page_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def _manifest_path(self, file_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}.pages.json")
+
+    def _cached_file(self, file_hash: str) -> Optional[List[str]]:
+        """All page texts of a file seen before, without parsing it, if every page is cached"""
+        path = self._manifest_path(file_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            hashes = json.load(f)
+        pages = [self._read_cache(page_hash) for page_hash in hashes]
+        return None if any(text is None for text in pages) else pages
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """Yield the text of each page, in page order, as pages finish"""
+        deadline = time.monotonic() + self.timeout_seconds
+        # Hashing the bytes does not parse them, so it is safe in this process
+        with open(file_path, 'rb') as f:
+            file_hash = f"v{CACHE_KEY_VERSION}-" + hashlib.sha256(f.read()).hexdigest()
+        pages = self._cached_file(file_hash)
+        if pages is not None:
+            yield from pages
+            return
+
+        # One worker first: it reads the page index, and alone extracts a single uncached page.
+        # More workers start only once the page count shows they have work.
+        pools = [self._pool(1)]
+        try:
+            # Parsing for the page keys is as untrusted as extraction: same limits
+            hashes = self._wait(pools[0].apply_async(_page_hashes, (file_path,)), deadline, file_path, "the page index")
+            self._write_manifest(file_hash, hashes)
+            cached = {i: self._read_cache(page_hash) for i, page_hash in enumerate(hashes)}
+            uncached = [i for i, text in cached.items() if text is None]
+            extra_workers = min(self.max_workers, len(uncached)) - 1
+            if extra_workers > 0:
+                pools.append(self._pool(extra_workers))
+            # The first uncached page goes to the index worker, the rest to the extra pool
+            pending = {
+                i: (pools[0] if n == 0 else pools[-1]).apply_async(_extract_page, (file_path, i))
+                for n, i in enumerate(uncached)
+            }
+            for i in range(len(hashes)):
+                if i in pending:
+                    text = self._wait(pending[i], deadline, file_path, f"page {i}")
+                    self._write_cache(hashes[i], text)
+                    yield text
+                else:
+                    yield cached[i]
+        finally:
+            # terminate() also kills workers stuck on a pathological page
+            for pool in pools:
+                pool.terminate()
+                pool.join()
+
+    def _pool(self, processes: int):
+        # spawn, not fork: the caller may be a threaded server process
+        return multiprocessing.get_context("spawn").Pool(
+            processes=processes,
+            initializer=_limit_worker_memory,
+            initargs=(self.memory_limit_mb * 1024 * 1024,)
+        )
+
+    def _write_manifest(self, file_hash: str, hashes: List[str]):
+        path = self._manifest_path(file_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(hashes, f)
+        os.replace(tmp_path, path)
+
+    def _wait(self, result, deadline: float, file_path: str, what: str):
+        """Result of a pool task within the file's remaining time budget"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise PDFExtractionError(f"Timed out extracting {file_path} after {self.timeout_seconds}s")
+        try:
+            return result.get(timeout=remaining)
+        except multiprocessing.TimeoutError:
+            raise PDFExtractionError(f"Timed out extracting {file_path} after {self.timeout_seconds}s")
+        except MemoryError:
+            raise PDFExtractionError(f"Reading {what} of {file_path} exceeded {self.memory_limit_mb}MB")
+
+    def extract_text(self, file_path: str, separator: str = "\n") -> str:
+        """Extract the whole document as one string"""
+        return separator.join(self.iter_pages(file_path))
@@ -0,0 +1,175 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def _cache_tensors(past) -> Iterator[Any]:
+    """Key/value tensors of a transformers cache (Cache object or legacy tuples)"""
+    if hasattr(past, "layers"):
+        for layer in past.layers:
+            for tensor in (getattr(layer, "keys", None), getattr(layer, "values", None)):
+                if tensor is not None:
+                    yield tensor
+    elif hasattr(past, "key_cache"):
+        yield from past.key_cache
+        yield from past.value_cache
+    else:
+        for layer in past:
+            yield from layer
+
+
+def cache_nbytes(past) -> int:
+    return sum(tensor.numel() * tensor.element_size() for tensor in _cache_tensors(past))
+
+
+def crop_cache(past, length: int):
+    """Copy of `past` holding only its first `length` positions"""
+    if hasattr(past, "crop"):
+        cropped = copy.deepcopy(past)
+        cropped.crop(length)
+        return cropped
+    return tuple(tuple(tensor[..., :length, :].clone() for tensor in layer) for layer in past)
+
+
+class _Node:
+    __slots__ = ("edge", "parent", "children", "depth", "past", "nbytes")
+
+    def __init__(self, edge: Tuple[int, ...], parent: Optional["_Node"], depth: int):
+        self.edge = edge
+        self.parent = parent
+        self.children: Dict[int, "_Node"] = {}
+        self.depth = depth
+        self.past = None
+        self.nbytes = 0
+
+
+class PrefixKVCache:
+    """
+    Radix tree over prompt token ids whose nodes can hold the model's
+    past_key_values for exactly that prefix (the persona system prompt, the
+    system prompt plus a retrieved context). A generation resumes from the
+    longest cached prefix of its prompt and only prefills the rest. Entries
+    are evicted least recently used first once their tensors exceed
+    `max_bytes`. Lookups return a deep copy, since generate() extends the
+    cache it is given in place.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._root = _Node((), None, 0)
+        self._lru: "OrderedDict[_Node, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0
+        self.evictions = 0
+
+    def lookup(self, ids: Sequence[int]) -> Tuple[int, Any]:
+        """
+        (length, past) of the longest cached proper prefix of `ids`, or
+        (0, None). At least one token is always left for the model to process.
+        """
+        with self._lock:
+            best = None
+            node, i = self._root, 0
+            while i < len(ids):
+                child = node.children.get(ids[i])
+                if child is None or tuple(ids[i:i + len(child.edge)]) != child.edge:
+                    break
+                node, i = child, i + len(child.edge)
+                if node.past is not None and node.depth < len(ids):
+                    best = node
+
+            if best is None:
+                self.misses += 1
+                return 0, None
+            self.hits += 1
+            self.reused_tokens += best.depth
+            self._lru.move_to_end(best)
+            past = best.past
+            depth = best.depth
+        return depth, copy.deepcopy(past)
+
+    def insert(self, ids: Sequence[int], past):
+        """Cache `past` (covering exactly `ids`) as the entry for that prefix"""
+        ids = tuple(ids)
+        nbytes = cache_nbytes(past)
+        if not ids or nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            node = self._node_for(ids)
+            if node.past is not None:
+                self.nbytes -= node.nbytes
+            node.past, node.nbytes = past, nbytes
+            self.nbytes += nbytes
+            self._lru[node] = None
+            self._lru.move_to_end(node)
+
+            while self.nbytes > self.max_bytes and self._lru:
+                oldest, _ = self._lru.popitem(last=False)
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _node_for(self, ids: Tuple[int, ...]) -> _Node:
+        """Walk to (creating or splitting edges as needed) the node at depth len(ids)"""
+        node, i = self._root, 0
+        while i < len(ids):
+            child = node.children.get(ids[i])
+            if child is None:
+                leaf = _Node(ids[i:], node, len(ids))
+                node.children[ids[i]] = leaf
+                return leaf
+
+            common = 0
+            while common < len(child.edge) and i + common < len(ids) and child.edge[common] == ids[i + common]:
+                common += 1
+            if common < len(child.edge):
+                middle = _Node(child.edge[:common], node, node.depth + common)
+                node.children[ids[i]] = middle
+                child.edge = child.edge[common:]
+                child.parent = middle
+                middle.children[child.edge[0]] = child
+                child = middle
+            node, i = child, i + common
+        return node
+
+    def _drop(self, node: _Node):
+        self.nbytes -= node.nbytes
+        node.past, node.nbytes = None, 0
+        # Prune branches that no longer lead to any entry
+        while node.parent is not None and node.past is None and not node.children:
+            del node.parent.children[node.edge[0]]
+            node = node.parent
+
+    def clear(self):
+        with self._lock:
+            self._root = _Node((), None, 0)
+            self._lru.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "reused_tokens": self.reused_tokens,
+            "evictions": self.evictions
+        }
+
+
+def prefix_boundaries(offsets: List[Tuple[int, int]], char_positions: List[int], limit: int) -> List[int]:
+    """Token counts covering the prompt up to each character position (from a tokenizer offset mapping)"""
+    boundaries = set()
+    for position in char_positions:
+        count = next((i for i, (_, end) in enumerate(offsets) if end > position), len(offsets))
+        if 0 < count < limit:
+            boundaries.add(count)
+    return sorted(boundaries)
@@ -0,0 +1,82 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class QueryBatcher:
+    """
+    Asyncio micro-batcher: collects requests that arrive within a short
+    window (or until the batch is full), runs them through one batched
+    call, and resolves each caller's future with its own result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+        self._in_flight = set()
+        self.batch_sizes = Counter()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one request and wait for its result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batch_sizes[len(batch)] += 1
+            # Dispatch without awaiting so the next batch can form while this one runs
+            task = loop.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[tuple]):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.batch_fn(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = sum(self.batch_sizes.values())
+        queries = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": batches,
+            "queries": queries,
+            "avg_batch_size": round(queries / batches, 2) if batches else 0.0,
+            "batch_size_distribution": {str(size): count for size, count in sorted(self.batch_sizes.items())}
+        }
@@ -0,0 +1,49 @@
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+# Keyword cues per resume section (the same section names the chunker tags)
+SECTION_CUES = {
+    "contact": r"e-?mail|phone|contact|reach (you|out)|linkedin|github|portfolio (link|url|site)|website|where .*(live|based)|location|located",
+    "experience": r"work(ed|ing)? (at|for)|job|compan(y|ies)|employ(er|ment)|role|experience|career|position|intern(ship)?|publicis|sapient|tavant|capital numbers|vibrant info|years",
+    "projects": r"projects?|side project|synth ai|food delivery|app(lication)?s? (you|did)|github repo",
+    "skills": r"skills?|tech(nologies| stack)?|stack|languages?|frameworks?|tools?|proficien|know (how to|about)|familiar with|react|node|python|typescript|javascript|aws|docker",
+    "education": r"educat|degree|universit|college|stud(y|ied)|graduat|b\.?\s?tech|school|qualification",
+}
+
+
+class SectionRouter:
+    """
+    Keyword router from a question to the resume sections likely to answer
+    it. Retrieval boosts hits from those sections; the route is a hint, not a
+    filter. Returns None when no section is cued or when so many are that
+    the boost would not discriminate.
+    """
+
+    def __init__(self, max_sections: int = 3):
+        self.max_sections = max_sections
+        self.patterns = {section: re.compile(rf"\b({cue})", re.IGNORECASE) for section, cue in SECTION_CUES.items()}
+        self._lock = threading.Lock()
+        self.routed = Counter()
+        self.unrouted = 0
+
+    def route(self, query: str) -> Optional[Tuple[str, ...]]:
+        cued = {section for section, pattern in self.patterns.items() if pattern.search(query)}
+        if "projects" in cued:
+            # Employer projects (client portals etc.) are chunked under experience
+            cued.add("experience")
+        sections = tuple(sorted(cued))
+        with self._lock:
+            if not sections or len(sections) > self.max_sections:
+                self.unrouted += 1
+                return None
+            self.routed[sections] += 1
+        return sections
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routed": sum(self.routed.values()),
+            "unrouted": self.unrouted,
+            "routes": {",".join(sections): count for sections, count in self.routed.most_common()}
+        }
@@ -1,111 +1,299 @@
 import os
-from typing import List, Dict, Any
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-import PyPDF2
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import time
+from typing import List, Dict, Any, Iterator, Callable
 import json
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache, content_hash, chunk_id
+from app.services.query_cache import LRUCache, normalize_query
+from app.services.vector_store import create_vector_store
+from app.services.query_batcher import QueryBatcher
+from app.services.bounded_executor import BoundedExecutor
+from app.services.bm25_index import BM25Index, reciprocal_rank_fusion
+from app.services.pdf_extractor import PDFExtractor
+from app.services.embedding_backend import create_embedder
+from app.services.reranker import CrossEncoderReranker
+from app.services.chunker import create_chunker
+from app.services.rw_lock import ReadWriteLock
+from app.services.knowledge_pack import load_knowledge_pack
+from app.services.dedup import MinHashDeduplicator
+from app.services.query_router import SectionRouter
 
 class RAGService:
     def __init__(self):
         self.is_initialized = False
         self.embeddings_model = None
+        self.embedding_model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        self.embedding_backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()  # torch or onnx
+        self.embedding_cache = None
         self.vector_store = None
-        self.collection = None
+        self.pdf_extractor = PDFExtractor()
+        self.chunker = None
+        
+        # Resume sources: the PDF indexed by default and the structured JSON merged into it
+        self.resume_pdf_path = os.getenv("RESUME_PDF_PATH", "./data/abdul@resume.pdf")
+        self.structured_data_path = os.getenv("RESUME_JSON_PATH", "./data/resume_structured.json")
+        
+        # Precompiled chunks, embeddings and BM25 postings (see app.services.knowledge_pack)
+        self.knowledge_pack_path = os.getenv("KNOWLEDGE_PACK", "./persona.pack")
+        self.knowledge_pack = None
+        
+        # Sparse (BM25) index searched next to the dense one and merged with RRF
+        self.bm25_index = None
+        self.bm25_index_path = os.getenv("BM25_INDEX_PATH", "./bm25_index.json")
+        self.hybrid_search = os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+        self.hybrid_candidates = int(os.getenv("HYBRID_CANDIDATES", "10"))
+        self.rrf_k = int(os.getenv("RRF_K", "60"))
+        
+        # MinHash near-duplicate collapse of PDF vs structured chunks before embedding
+        self.deduplicator = None
+        if os.getenv("DEDUP_ENABLED", "true").lower() == "true":
+            self.deduplicator = MinHashDeduplicator(threshold=float(os.getenv("DEDUP_THRESHOLD", "0.8")))
+        
+        # Keyword routing of questions to resume sections, whose hits are ranked up
+        self.router = SectionRouter() if os.getenv("QUERY_ROUTING", "true").lower() == "true" else None
+        self.route_boost = float(os.getenv("QUERY_ROUTING_BOOST", "0.5"))
+        self.route_overfetch = int(os.getenv("QUERY_ROUTING_OVERFETCH", "2"))
+        
+        # Index builds prepare everything off to the side, then swap under the write lock
+        self._swap_lock = ReadWriteLock()
+        self.index_batch_size = int(os.getenv("INDEX_EMBED_BATCH_SIZE", "32"))
+        
+        # Two-tier query cache: query text -> embedding, (query, k, version) -> results
+        cache_size = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+        cache_ttl = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+        self.query_embedding_cache = LRUCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        self.search_results_cache = LRUCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        self.index_version = 0
+        
+        # Optional cross-encoder rerank: over-fetch candidates, keep the best k
+        self.reranker = None
+        self.rerank_enabled = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+        self.rerank_candidates = int(os.getenv("RERANK_CANDIDATES", "10"))
+        self.rerank_budget_ms = float(os.getenv("RERANK_BUDGET_MS", "150"))
+        
+        # Blocking embedding/vector store work runs on dedicated pools so it never
+        # stalls the event loop; indexing has its own pool so a long re-index
+        # cannot occupy the workers serving chat retrieval
+        self.retrieval_executor = BoundedExecutor(
+            "rag-retrieval",
+            max_workers=int(os.getenv("RETRIEVAL_WORKERS", "2")),
+            max_queue=int(os.getenv("RETRIEVAL_QUEUE_SIZE", "64"))
+        )
+        self.indexing_executor = BoundedExecutor(
+            "rag-indexing",
+            max_workers=1,
+            max_queue=int(os.getenv("INDEXING_QUEUE_SIZE", "4"))
+        )
+        
+        # Concurrent queries are coalesced into one encode + one multi-query search
+        self.query_batcher = QueryBatcher(
+            self._search_batch,
+            max_batch_size=int(os.getenv("EMBED_BATCH_MAX_SIZE", "16")),
+            max_wait_ms=float(os.getenv("EMBED_BATCH_WAIT_MS", "5"))
+        )
         
     async def initialize(self):
-        """Initialize the RAG system with ChromaDB and embeddings"""
+        """Initialize the RAG system with the vector store and embeddings"""
         try:
             # Initialize embeddings model (runs locally, no API needed)
-            self.embeddings_model = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            # Initialize ChromaDB (local persistent storage)
-            self.vector_store = chromadb.PersistentClient(
-                path="./chroma_db",
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
+            self.embeddings_model = create_embedder(self.embedding_model_name, self.embedding_backend)
+            self.embedding_cache = EmbeddingCache(
+                os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache"),
+                self.embeddings_model.name
             )
             
-            # Create or get collection for resume data
-            self.collection = self.vector_store.get_or_create_collection(
-                name="sarim_resume",
-                metadata={"hnsw:space": "cosine"}
-            )
+            # Chunks are sized in tokens of the serving model's tokenizer
+            self.chunker = create_chunker()
+            
+            # Vector index: ChromaDB by default, or in-process NumPy via VECTOR_STORE=numpy
+            self.vector_store = create_vector_store()
+            self.bm25_index = BM25Index.load(self.bm25_index_path)
+            
+            # A compiled knowledge pack seeds an empty index without any embedding work
+            self.knowledge_pack = load_knowledge_pack(self.knowledge_pack_path, self.embeddings_model.name)
+            if self.knowledge_pack is not None:
+                self._seed_from_knowledge_pack()
+            
+            if self.rerank_enabled:
+                self.reranker = CrossEncoderReranker(
+                    os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+                )
             
             self.is_initialized = True
-            print("✅ RAG Service initialized with ChromaDB")
+            print(f"✅ RAG Service initialized with {type(self.vector_store).__name__}")
             
         except Exception as e:
             print(f"❌ Failed to initialize RAG Service: {e}")
             raise e
     
-    async def index_resume(self, file_path: str) -> Dict[str, Any]:
+    def _seed_from_knowledge_pack(self):
+        """Fill an empty vector store from the pack, using its packed embeddings.
+        A populated store is left alone: index_resume owns it from then on."""
+        pack = self.knowledge_pack
+        seeded = 0
+        if not self.vector_store.get_ids(where={"source": "resume"}):
+            with self._swap_lock.write():
+                self.vector_store.apply(upserts=(pack.chunk_ids, pack.embeddings, pack.chunk_texts, pack.chunk_metadatas))
+                self.bm25_index = pack.bm25_index()
+                self._invalidate_query_caches()
+            seeded = len(pack.chunk_ids)
+        elif self.bm25_index is None:
+            self.bm25_index = pack.bm25_index()
+        print(f"✅ Knowledge pack {pack.version}: {len(pack.chunk_ids)} chunks, {seeded} seeded into the index")
+    
+    async def index_resume(self, file_path: str, progress: Callable[[str, float], None] = None) -> Dict[str, Any]:
         """Extract and index resume data into vector database"""
+        return await self.indexing_executor.run(self._index_resume_sync, file_path, progress)
+    
+    def _index_resume_sync(self, file_path: str, progress: Callable[[str, float], None] = None) -> Dict[str, Any]:
+        """
+        Blocking body of index_resume, run on the indexing executor.
+        The new index is built off to the side while searches keep reading
+        the current one; only the final commit holds the swap lock.
+        `progress(stage, fraction)` is called as the build advances.
+        """
+        report = progress or (lambda stage, fraction: None)
         try:
-            # Extract text from PDF
-            resume_text = self._extract_pdf_text(file_path)
+            # Extract text from PDF; pages are chunked as they come out of the extraction pool
+            report("extracting", 0.0)
+            chunks = [dict(chunk, origin="pdf") for chunk in self.chunker.chunk_stream(self._iter_pdf_pages(file_path))]
             
             # Also load structured data if available
+            report("chunking", 0.2)
             structured_data = self._load_structured_resume_data()
             
-            # Split text into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50,
-                length_function=len,
-            )
-            
-            chunks = text_splitter.split_text(resume_text)
-            
             # Add structured data as additional chunks
             if structured_data:
-                chunks.extend(self._create_structured_chunks(structured_data))
+                chunks.extend(dict(chunk, origin="structured") for chunk in self._create_structured_chunks(structured_data))
+            
+            # PDF and structured chunks often state the same fact; keep one copy before embedding
+            duplicates_removed = 0
+            if self.deduplicator is not None:
+                report("deduplicating", 0.25)
+                chunks, duplicates_removed = self.deduplicator.deduplicate(chunks)
             
-            # Generate embeddings
-            embeddings = self.embeddings_model.encode(chunks).tolist()
+            # Content-hashed ids: identical text always maps to the same id,
+            # so unchanged chunks can be skipped on re-index
+            chunk_by_id = {}
+            for chunk in chunks:
+                chunk_by_id.setdefault(self._chunk_id(chunk["text"]), chunk)
+            ids = list(chunk_by_id.keys())
+            metadata_by_id = {
+                chunk_id: {
+                    "source": "resume",
+                    "section": chunk_by_id[chunk_id]["section"],
+                    "chunk_id": i,
+                    "content_hash": content_hash(chunk_by_id[chunk_id]["text"]),
+                    "embedding_model": self.embeddings_model.name,
+                    # Provenance as scalars, which is all Chroma metadata allows
+                    "origins": chunk_by_id[chunk_id].get("origins", chunk_by_id[chunk_id]["origin"]),
+                    "duplicates_merged": chunk_by_id[chunk_id].get("duplicates", 0)
+                }
+                for i, chunk_id in enumerate(ids)
+            }
             
-            # Prepare documents for ChromaDB
-            ids = [f"doc_{i}" for i in range(len(chunks))]
-            metadatas = [{"source": "resume", "chunk_id": i} for i in range(len(chunks))]
+            existing_ids = set(self.vector_store.get_ids(where={"source": "resume"}))
+            new_ids = [chunk_id for chunk_id in ids if chunk_id not in existing_ids]
+            kept_ids = [chunk_id for chunk_id in ids if chunk_id in existing_ids]
+            stale_ids = list(existing_ids - set(ids))
             
-            # Clear existing data and add new
-            self.collection.delete(where={"source": "resume"})
-            self.collection.add(
-                embeddings=embeddings,
-                documents=chunks,
-                metadatas=metadatas,
-                ids=ids
-            )
+            # Embed only new/changed chunks, reusing the on-disk cache where possible
+            report("embedding", 0.3)
+            embedded = 0
+            upserts = None
+            if new_ids:
+                new_texts = [chunk_by_id[chunk_id]["text"] for chunk_id in new_ids]
+                embeddings, embedded = self._embed_with_cache(
+                    new_texts, lambda fraction: report("embedding", 0.3 + 0.6 * fraction)
+                )
+                upserts = (new_ids, embeddings, new_texts, [metadata_by_id[chunk_id] for chunk_id in new_ids])
+            
+            # The sparse index is cheap to rebuild in full and is swapped in whole
+            bm25_index = BM25Index()
+            bm25_index.build(ids, [chunk_by_id[chunk_id]["text"] for chunk_id in ids], [metadata_by_id[chunk_id] for chunk_id in ids])
             
-            return {"status": "success", "count": len(chunks)}
+            # Commit: searches see either the old index or the new one, never a mix
+            report("committing", 0.9)
+            with self._swap_lock.write():
+                self.vector_store.apply(
+                    upserts=upserts,
+                    # Unchanged chunks keep their embeddings; only refresh positional metadata
+                    metadata_updates=(kept_ids, [metadata_by_id[chunk_id] for chunk_id in kept_ids]),
+                    deletes=stale_ids
+                )
+                bm25_index.save(self.bm25_index_path)
+                self.bm25_index = bm25_index
+                
+                if new_ids or stale_ids:
+                    self._invalidate_query_caches()
+            
+            report("done", 1.0)
+            return {
+                "status": "success",
+                "count": len(ids),
+                "added": len(new_ids),
+                "removed": len(stale_ids),
+                "unchanged": len(kept_ids),
+                "embedded": embedded,
+                "duplicates_removed": duplicates_removed
+            }
             
         except Exception as e:
             print(f"Error indexing resume: {e}")
             raise e
     
-    def _extract_pdf_text(self, file_path: str) -> str:
-        """Extract text from PDF file"""
-        text = ""
+    def _chunk_id(self, text: str) -> str:
+        """Chunk id from the text and the embedding backend, so switching
+        backends re-embeds the corpus instead of mixing vector spaces"""
+        return chunk_id(self.embeddings_model.name, text)
+    
+    def _embed_with_cache(self, texts: List[str], progress: Callable[[float], None] = None):
+        """Embed texts, encoding only those missing from the embedding cache.
+        Returns the embedding matrix and the number of texts actually encoded."""
+        hashes = [content_hash(text) for text in texts]
+        cached = self.knowledge_pack.embeddings_for(hashes) if self.knowledge_pack is not None else {}
+        cached.update(self.embedding_cache.get_many([text_hash for text_hash in hashes if text_hash not in cached]))
+        missing = [i for i, text_hash in enumerate(hashes) if text_hash not in cached]
+        
+        # Encode in slices so long builds can report progress
+        for start in range(0, len(missing), self.index_batch_size):
+            batch = missing[start:start + self.index_batch_size]
+            encoded = self.embeddings_model.encode([texts[i] for i in batch])
+            fresh = {hashes[i]: encoded[j] for j, i in enumerate(batch)}
+            self.embedding_cache.put_many(fresh)
+            cached.update(fresh)
+            if progress:
+                progress(min(start + len(batch), len(missing)) / len(missing))
+        
+        embeddings = np.stack([cached[text_hash] for text_hash in hashes]).astype(np.float32)
+        return embeddings, len(missing)
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embedding matrix for texts, through the on-disk embedding cache (blocking)"""
+        embeddings, _ = self._embed_with_cache(texts)
+        return embeddings
+    
+    def _iter_pdf_pages(self, file_path: str) -> Iterator[str]:
+        """Stream page texts from the PDF, falling back to manual data if extraction fails"""
+        yielded = False
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
+            for page_text in self.pdf_extractor.iter_pages(file_path):
+                yielded = True
+                yield page_text
         except Exception as e:
             print(f"Error extracting PDF: {e}")
-            # Fallback to manual data if PDF extraction fails
-            text = self._get_fallback_resume_text()
-        
-        return text
+            if not yielded:
+                # Fallback to manual data if PDF extraction fails
+                yield self._get_fallback_resume_text()
+    
+    def _extract_pdf_text(self, file_path: str) -> str:
+        """Extract text from PDF file"""
+        return "\n".join(self._iter_pdf_pages(file_path))
     
     def _load_structured_resume_data(self) -> Dict[str, Any]:
         """Load structured resume data from JSON"""
         try:
-            with open('./data/resume_structured.json', 'r') as f:
+            with open(self.structured_data_path, 'r') as f:
                 return json.load(f)
         except:
             # Return default structured data
@@ -157,40 +345,9 @@ class RAGService:
                 ]
             }
     
-    def _create_structured_chunks(self, data: Dict[str, Any]) -> List[str]:
-        """Convert structured data into searchable chunks"""
-        chunks = []
-        
-        # Personal info
-        chunks.append(f"I am {data['name']}, also known as {data.get('nickname', 'Abdul')}, currently working as {data['current_role']}")
-        
-        # Experience
-        for exp in data.get('experience', []):
-            chunks.append(
-                f"Work experience: {exp['role']} at {exp['company']} "
-                f"from {exp['duration']}. {exp['description']}"
-            )
-        
-        # Projects
-        for proj in data.get('projects', []):
-            chunks.append(
-                f"Project: {proj['name']} - {proj['description']}. "
-                f"Built with {', '.join(proj['tech'])}. "
-                f"Key features: {', '.join(proj.get('highlights', []))}"
-            )
-        
-        # Skills
-        skills = data.get('skills', {})
-        for category, items in skills.items():
-            chunks.append(f"My {category} skills include: {', '.join(items)}")
-        
-        # Education
-        for edu in data.get('education', []):
-            chunks.append(
-                f"Education: {edu['degree']} from {edu['university']} in {edu['year']}"
-            )
-        
-        return chunks
+    def _create_structured_chunks(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert structured data into searchable, section-tagged chunks"""
+        return self.chunker.chunk_structured(data)
     
     def _get_fallback_resume_text(self) -> str:
         """Fallback resume text if PDF extraction fails"""
@@ -223,37 +380,181 @@ class RAGService:
         - B.Tech in Computer Science (2021)
         """
     
-    async def search_similar(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
-        """Search for similar documents in the vector store"""
+    async def search_similar(
+        self,
+        query: str,
+        k: int = 3,
+        time_budget_ms: float = None
+    ) -> List[Dict[str, Any]]:
+        """Search for similar documents in the vector store, optionally reranked"""
         try:
-            # Generate embedding for query
-            query_embedding = self.embeddings_model.encode(query).tolist()
+            started = time.perf_counter()
+            rerank = self.reranker is not None
+            normalized = normalize_query(query)
+            sections = self.router.route(query) if self.router else None
+            results_key = (normalized, k, rerank, sections, self.index_version)
+            cached_results = self.search_results_cache.get(results_key)
+            if cached_results is not None:
+                return [dict(result) for result in cached_results]
             
-            # Search in ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=k,
-                include=['documents', 'metadatas', 'distances']
-            )
+            fetch_k = max(k, self.rerank_candidates) if rerank else k
+            # One hybrid search; a route over-fetches a little and re-weights its sections
+            search_k = fetch_k * self.route_overfetch if sections else fetch_k
+            _, formatted_results = await self.query_batcher.submit((query, normalized, search_k, None))
+            if sections:
+                formatted_results = self._boost_sections(formatted_results, sections, fetch_k)
             
-            # Format results
-            formatted_results = []
-            for i in range(len(results['documents'][0])):
-                formatted_results.append({
-                    'content': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'score': 1 - results['distances'][0][i]  # Convert distance to similarity
-                })
+            reranked = False
+            if rerank:
+                budget_ms = self.rerank_budget_ms if time_budget_ms is None else time_budget_ms
+                formatted_results, reranked = await self.retrieval_executor.run(
+                    self.reranker.rerank, query, formatted_results, k, started + budget_ms / 1000
+                )
             
-            return formatted_results
+            # A skipped rerank is not cached so a later, less loaded request can still rerank
+            if reranked or not rerank:
+                self.search_results_cache.set(results_key, formatted_results)
+            return [dict(result) for result in formatted_results]
             
         except Exception as e:
             print(f"Error searching similar documents: {e}")
             return []
     
+    def _boost_sections(self, results: List[Dict[str, Any]], sections: tuple, k: int) -> List[Dict[str, Any]]:
+        """Re-rank by 1 / rank, multiplied by (1 + route_boost) for hits in the routed sections,
+        so a routed hit overtakes unrouted ones ranked less than (1 + route_boost) times better"""
+        def weight(ranked) -> float:
+            rank, result = ranked
+            boost = 1 + self.route_boost if result['metadata'].get('section') in sections else 1
+            return boost / rank
+        ranked = sorted(enumerate(results, start=1), key=weight, reverse=True)
+        return [result for _, result in ranked[:k]]
+    
+    async def embed_query(self, query: str) -> np.ndarray:
+        """Query embedding, shared with retrieval through the query cache and micro-batcher"""
+        normalized = normalize_query(query)
+        cached = self.query_embedding_cache.get(normalized)
+        if cached is not None:
+            return cached
+        embedding, _ = await self.query_batcher.submit((query, normalized, 0, None))
+        return embedding
+    
+    async def _search_batch(self, requests: List[tuple]) -> List[tuple]:
+        """Run a micro-batch of (query, normalized, k, where) requests on the retrieval executor"""
+        return await self.retrieval_executor.run(self._search_batch_sync, requests)
+    
+    def _search_batch_sync(self, requests: List[tuple]) -> List[tuple]:
+        """One batched encode for uncached queries and one multi-query vector store call.
+        Returns (embedding, results) per request; k=0 requests only want the embedding.
+        Requests with a metadata filter are searched per distinct filter."""
+        embeddings = [self.query_embedding_cache.get(normalized) for _, normalized, _, _ in requests]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            # Routed searches submit the same query twice; encode it once
+            unique = list(dict.fromkeys(requests[i][1] for i in missing))
+            first = {}
+            for i in missing:
+                first.setdefault(requests[i][1], requests[i][0])
+            encoded = dict(zip(unique, self.embeddings_model.encode([first[normalized] for normalized in unique])))
+            for i in missing:
+                embeddings[i] = encoded[requests[i][1]]
+            for normalized, embedding in encoded.items():
+                self.query_embedding_cache.set(normalized, embedding)
+        
+        searching = [i for i, (_, _, k, _) in enumerate(requests) if k > 0]
+        groups: Dict[str, List[int]] = {}
+        for i in searching:
+            groups.setdefault(json.dumps(requests[i][3], sort_keys=True), []).append(i)
+        max_k = max((requests[i][2] for i in searching), default=0)
+        use_sparse = self.hybrid_search and self.bm25_index is not None
+        fetch_k = max(max_k, self.hybrid_candidates) if use_sparse else max_k
+        hits_per_query = {}
+        sparse_per_query = {}
+        # Dense and sparse lookups read the same index generation
+        with self._swap_lock.read():
+            for members in groups.values():
+                where = requests[members[0]][3]
+                dense = self.vector_store.query(np.stack([embeddings[i] for i in members]), fetch_k, where=where)
+                hits_per_query.update(zip(members, dense))
+            if use_sparse:
+                # Exact-term matches (names, emails, project names) come from BM25
+                sparse_per_query = {i: self.bm25_index.search(requests[i][0], fetch_k, requests[i][3]) for i in searching}
+        
+        results = []
+        for i, (query, _, k, _) in enumerate(requests):
+            dense_hits = hits_per_query.get(i, [])
+            if k == 0:
+                hits = []
+            elif use_sparse:
+                # Reciprocal-rank fusion merges both rankings
+                hits = reciprocal_rank_fusion([dense_hits, sparse_per_query[i]], k=self.rrf_k)
+            else:
+                hits = dense_hits
+            
+            results.append((embeddings[i], [
+                {
+                    'content': hit['content'],
+                    'metadata': hit['metadata'],
+                    'score': hit.get('score', 0.0),
+                    'bm25_score': hit.get('bm25_score', 0.0),
+                    'rrf_score': hit.get('rrf_score', 0.0)
+                }
+                for hit in hits[:k]
+            ]))
+        return results
+    
+    def _invalidate_query_caches(self):
+        """Drop cached query results after the collection changes"""
+        self.index_version += 1
+        self.query_embedding_cache.clear()
+        self.search_results_cache.clear()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the query caches"""
+        return {
+            "index_version": self.index_version,
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "search_results": self.search_results_cache.stats()
+        }
+    
+    def get_knowledge_pack_info(self) -> Dict[str, Any]:
+        """Version and contents of the loaded knowledge pack"""
+        if self.knowledge_pack is None:
+            return {"loaded": False, "path": self.knowledge_pack_path}
+        return dict(self.knowledge_pack.info(), loaded=True)
+    
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """Batch-size distribution of the query micro-batcher"""
+        return self.query_batcher.stats()
+    
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """How often queries were routed to a section filter or fell back"""
+        if self.router is None:
+            return {"enabled": False}
+        return dict(self.router.stats(), enabled=True)
+    
+    def get_rerank_stats(self) -> Dict[str, Any]:
+        """Latency and skip counters of the rerank stage"""
+        if self.reranker is None:
+            return {"enabled": False}
+        return dict(self.reranker.stats(), enabled=True)
+    
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Queue depth and timings of the retrieval and indexing executors"""
+        return {
+            "retrieval": self.retrieval_executor.stats(),
+            "indexing": self.indexing_executor.stats()
+        }
+    
+    def shutdown(self):
+        """Stop the background executors"""
+        self.retrieval_executor.shutdown()
+        self.indexing_executor.shutdown()
+    
     async def get_document_count(self) -> int:
         """Get total number of documents in vector store"""
         try:
-            return self.collection.count()
+            return self.vector_store.count()
         except:
             return 0
\ No newline at end of file
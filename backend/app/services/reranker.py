@@ -0,0 +1,87 @@
+import time
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CrossEncoderReranker:
+    """
+    Second-stage reranker: scores (query, chunk) pairs in one batched
+    cross-encoder forward pass and keeps the best few. Skips itself when
+    the caller's deadline leaves less time than a pass is expected to take.
+    """
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", max_length: int = 256):
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        self.model_name = model_name
+        self._lock = threading.Lock()
+
+        # Running estimate of the cost of one pass: fixed overhead + per-pair cost
+        self.per_pair_ms = 5.0
+        self.overhead_ms = 5.0
+
+        self.calls = 0
+        self.skipped = 0
+        self.latencies_ms = deque(maxlen=1024)
+
+    def estimate_ms(self, num_pairs: int) -> float:
+        return self.overhead_ms + self.per_pair_ms * num_pairs
+
+    def rerank(
+        self,
+        query: str,
+        hits: List[Dict[str, Any]],
+        top_n: int,
+        deadline: Optional[float] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Return (hits, reranked). `deadline` is a time.perf_counter() value;
+        if it is too close, the first-stage order is kept.
+        """
+        if len(hits) <= 1:
+            return hits[:top_n], False
+
+        if deadline is not None:
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if remaining_ms < self.estimate_ms(len(hits)):
+                with self._lock:
+                    self.skipped += 1
+                return hits[:top_n], False
+
+        started = time.perf_counter()
+        scores = self.model.predict(
+            [(query, hit['content']) for hit in hits],
+            batch_size=len(hits),
+            show_progress_bar=False
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self.calls += 1
+            self.latencies_ms.append(elapsed_ms)
+            # Exponentially weighted per-pair cost keeps the skip decision honest
+            observed = max(elapsed_ms - self.overhead_ms, 0.0) / len(hits)
+            self.per_pair_ms = 0.8 * self.per_pair_ms + 0.2 * observed
+
+        reranked = [dict(hit, rerank_score=float(score)) for hit, score in zip(hits, scores)]
+        reranked.sort(key=lambda hit: hit['rerank_score'], reverse=True)
+        return reranked[:top_n], True
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "estimated_ms_per_pair": round(self.per_pair_ms, 3)
+        }
@@ -0,0 +1,98 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by query embedding: a lookup hits when a previously
+    answered question is within `threshold` cosine similarity. Bounded by
+    size (LRU) and TTL, and dropped whenever the index version changes.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._next_key = 0
+        self._matrix = None
+        self._keys = []
+        self._index_version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_generation_seconds = 0.0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _sync_version(self, index_version: int):
+        if self._index_version != index_version:
+            self._entries.clear()
+            self._matrix = None
+            self._index_version = index_version
+
+    def lookup(self, embedding, index_version: int) -> Optional[Dict[str, Any]]:
+        """Return the cached payload of the closest past question, if close enough"""
+        with self._lock:
+            self._sync_version(index_version)
+
+            now = time.monotonic()
+            expired = [key for key, entry in self._entries.items() if entry["expires_at"] < now]
+            for key in expired:
+                del self._entries[key]
+            if expired:
+                self._matrix = None
+
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            if self._matrix is None:
+                self._keys = list(self._entries.keys())
+                self._matrix = np.stack([self._entries[key]["embedding"] for key in self._keys])
+
+            scores = self._matrix @ self._normalize(embedding)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            key = self._keys[best]
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_generation_seconds += entry["generation_seconds"]
+            return dict(entry["payload"], similarity=float(scores[best]))
+
+    def store(self, embedding, payload: Dict[str, Any], index_version: int, generation_seconds: float = 0.0):
+        with self._lock:
+            self._sync_version(index_version)
+            self._entries[self._next_key] = {
+                "embedding": self._normalize(embedding),
+                "payload": payload,
+                "generation_seconds": generation_seconds,
+                "expires_at": time.monotonic() + self.ttl_seconds
+            }
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "saved_generation_seconds": round(self.saved_generation_seconds, 3)
+        }
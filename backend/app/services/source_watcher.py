@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class SourceWatcher:
+    """
+    Polls the resume sources (PDF, structured JSON) and triggers a re-index
+    once edits settle. A source's version is the hash of its bytes; files are
+    only re-read when their mtime or size changes, so a poll costs a stat
+    per path. The last indexed version is persisted so a restart after an
+    edit still re-indexes. Nothing is re-indexed while a source is missing
+    (the build would fall back to placeholder data), and on a first start
+    over an existing index (`is_indexed`) the current sources are adopted as
+    the indexed version instead of rebuilding.
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        reindex: Callable[[], Awaitable[Dict[str, Any]]],
+        is_indexed: Optional[Callable[[], Awaitable[bool]]] = None,
+        poll_interval: float = 1.0,
+        debounce_seconds: float = 2.0,
+        retry_seconds: float = 60.0,
+        state_path: Optional[str] = None
+    ):
+        self.paths = paths
+        self.reindex = reindex
+        self.is_indexed = is_indexed
+        self.poll_interval = poll_interval
+        self.debounce_seconds = debounce_seconds
+        self.retry_seconds = retry_seconds
+        self.state_path = state_path
+        self._task = None
+        self._file_versions: Dict[str, tuple] = {}
+
+        self.current_version: Optional[str] = None
+        self.last_indexed_version: Optional[str] = None
+        self.last_indexed_at: Optional[float] = None
+        self.pending_since: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        self.retry_at = 0.0
+        self.reindexes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.missing: List[str] = []
+
+        self._load_state()
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+            self.last_indexed_version = state.get("version")
+            self.last_indexed_at = state.get("indexed_at")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read watcher state {self.state_path}: {e}")
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": self.last_indexed_version, "indexed_at": self.last_indexed_at}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _file_version(self, path: str) -> Optional[str]:
+        """Content hash of one source (None if missing), recomputed only when its stat changes"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_versions.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._file_versions[path] = (signature, digest)
+        return digest
+
+    def fingerprint(self) -> Optional[str]:
+        """Combined version of all watched sources; None while any of them is missing"""
+        combined = hashlib.sha256()
+        self.missing = []
+        for path in self.paths:
+            version = self._file_version(path)
+            if version is None:
+                self.missing.append(path)
+            combined.update(f"{path}\n{version}\n".encode())
+        return None if self.missing else combined.hexdigest()[:16]
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Source watcher error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll(self):
+        """Detect changes and re-index once they have been quiet for debounce_seconds"""
+        now = time.time()
+        version = await asyncio.to_thread(self.fingerprint)
+        if version is None:
+            # A partial set of sources would be indexed with placeholder data
+            self.pending_since = None
+            return
+        if version != self.current_version:
+            self.current_version = version
+            self.last_change_at = now
+
+        if self.last_indexed_version is None and self.is_indexed is not None and await self.is_indexed():
+            # First start over an existing (e.g. knowledge pack seeded) index: adopt it
+            self.last_indexed_version = version
+            self.last_indexed_at = now
+            self._save_state()
+
+        if version == self.last_indexed_version:
+            self.pending_since = None
+            return
+        if self.pending_since is None:
+            self.pending_since = now
+
+        # Debounce bursts of edits (editors often write a file several times)
+        if now - self.last_change_at < self.debounce_seconds or now < self.retry_at:
+            return
+
+        build_started = time.time()
+        try:
+            self.last_result = await self.reindex()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self.retry_at = time.time() + self.retry_seconds
+            print(f"❌ Auto re-index failed: {e}")
+            return
+
+        self.reindexes += 1
+        self.last_error = None
+        self.last_indexed_version = version
+        self.last_indexed_at = time.time()
+        self._save_state()
+        self.pending_since = None
+        # Edits made while the build ran are stale from the moment it started
+        latest = await asyncio.to_thread(self.fingerprint)
+        if latest is not None and latest != version:
+            self.current_version = latest
+            self.last_change_at = time.time()
+            self.pending_since = build_started
+
+    def stats(self) -> Dict[str, Any]:
+        stale = self.current_version is not None and self.current_version != self.last_indexed_version
+        return {
+            "enabled": self._task is not None and not self._task.done(),
+            "paths": self.paths,
+            "missing": self.missing,
+            "current_version": self.current_version,
+            "last_indexed_version": self.last_indexed_version,
+            "last_indexed_at": self.last_indexed_at,
+            "stale": stale,
+            "lag_seconds": round(time.time() - self.pending_since, 3) if stale and self.pending_since else 0.0,
+            "reindexes": self.reindexes,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,396 @@
+import os
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+class VectorStore(ABC):
+    """
+    Minimal interface RAGService needs from a vector index.
+    Query results are returned per query embedding as lists of
+    {'id', 'content', 'metadata', 'score'} dicts, score being cosine similarity.
+    """
+
+    @abstractmethod
+    def get_ids(self, where: Optional[Dict[str, Any]] = None) -> List[str]:
+        ...
+
+    @abstractmethod
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict[str, Any]]):
+        ...
+
+    @abstractmethod
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        ...
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        ...
+
+    @abstractmethod
+    def query(self, query_embeddings, k: int, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def apply(self, upserts: Optional[tuple] = None, metadata_updates: Optional[tuple] = None, deletes: Optional[List[str]] = None):
+        """
+        Apply the changes of one index build together.
+        upserts = (ids, embeddings, documents, metadatas), metadata_updates = (ids, metadatas).
+        """
+        if upserts and upserts[0]:
+            self.upsert(*upserts)
+        if metadata_updates and metadata_updates[0]:
+            self.update_metadata(*metadata_updates)
+        if deletes:
+            self.delete(deletes)
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB persistent collection (HNSW + SQLite)"""
+
+    def __init__(self, path: str = "./chroma_db", collection_name: str = "sarim_resume", hnsw_params: Optional[Dict[str, Any]] = None):
+        import chromadb
+        from chromadb.config import Settings
+
+        self.client = chromadb.PersistentClient(
+            path=path,
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            # hnsw:* settings only take effect when the collection is created
+            metadata={"hnsw:space": "cosine", **(hnsw_params or {})}
+        )
+
+    def get_ids(self, where=None):
+        return self.collection.get(where=where, include=[])["ids"]
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(
+            embeddings=np.asarray(embeddings, dtype=np.float32),
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids
+        )
+
+    def update_metadata(self, ids, metadatas):
+        self.collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def query(self, query_embeddings, k, where=None):
+        results = self.collection.query(
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32),
+            n_results=k,
+            where=where,
+            include=['documents', 'metadatas', 'distances']
+        )
+
+        formatted = []
+        for q in range(len(results['ids'])):
+            formatted.append([
+                {
+                    'id': results['ids'][q][i],
+                    'content': results['documents'][q][i],
+                    'metadata': results['metadatas'][q][i],
+                    'score': 1 - results['distances'][q][i]  # Convert distance to similarity
+                }
+                for i in range(len(results['ids'][q]))
+            ])
+        return formatted
+
+    def count(self):
+        return self.collection.count()
+
+
+def _matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate the subset of Chroma's `where` syntax we use ($eq, $in, $and, $or)"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+# Set bits per byte, for Hamming distance over packed binary codes
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        return _POPCOUNT[values]
+
+QUANTIZATIONS = ("float32", "float16", "int8", "binary")
+
+# Shortlist size per requested hit before exact rescoring
+DEFAULT_RESCORE_FACTORS = {"float32": 1, "float16": 2, "int8": 4, "binary": 32}
+
+
+def quantize(matrix: np.ndarray, quantization: str):
+    """
+    Compact codes for L2-normalized rows: (codes, scales).
+    int8 uses one symmetric scale per vector; binary keeps the sign bits,
+    packed 8 per byte. scales is None for the other formats.
+    """
+    if quantization == "float16":
+        return matrix.astype(np.float16), None
+    if quantization == "int8":
+        scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127.0
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    if quantization == "binary":
+        return np.packbits(matrix > 0, axis=1), None
+    raise ValueError(f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}")
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact cosine search over a contiguous, L2-normalized embedding matrix.
+    The matrix is persisted as an .npy file and memory-mapped on load, with
+    documents and metadata kept in a JSON sidecar. Intended for small corpora
+    where brute force beats an ANN index on both latency and footprint.
+
+    With dtype float16, int8 or binary the first pass scans compact codes
+    (held in memory) and only a shortlist of rows is rescored against the
+    memory-mapped float32 vectors, so reported scores stay exact.
+    """
+
+    def __init__(self, path: str = "./numpy_index", dtype: str = "float32", rescore_factor: Optional[int] = None):
+        if dtype not in QUANTIZATIONS:
+            raise ValueError(f"Unknown NumPy index dtype {dtype!r}, expected one of {QUANTIZATIONS}")
+        self.path = path
+        self.quantization = dtype
+        self.rescore_factor = rescore_factor or DEFAULT_RESCORE_FACTORS[dtype]
+        self.matrix_path = os.path.join(path, "vectors.npy")
+        self.codes_path = os.path.join(path, f"codes.{dtype}.npy")
+        self.scales_path = os.path.join(path, f"scales.{dtype}.npy")
+        self.records_path = os.path.join(path, "records.json")
+        self._write_lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._state = self._load()
+
+    def _load(self):
+        """Load (ids, documents, metadatas, matrix, codes, scales), memory-mapping the matrix"""
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.records_path)):
+            return [], [], [], np.zeros((0, 0), dtype=np.float32), None, None
+
+        with open(self.records_path, 'r') as f:
+            records = json.load(f)
+        matrix = np.load(self.matrix_path, mmap_mode='r')
+        if len(matrix) != len(records["ids"]):
+            # Interrupted swap: vectors and records are from different snapshots
+            print(f"⚠️ {self.path} is inconsistent ({len(matrix)} vectors, {len(records['ids'])} records), starting empty so it is rebuilt")
+            return [], [], [], np.zeros((0, 0), dtype=np.float32), None, None
+
+        codes, scales = None, None
+        if self.quantization != "float32":
+            if os.path.exists(self.codes_path):
+                codes = np.load(self.codes_path)
+                if self.quantization == "int8" and os.path.exists(self.scales_path):
+                    scales = np.load(self.scales_path)
+            if codes is None or len(codes) != len(records["ids"]) or (self.quantization == "int8" and scales is None):
+                # Index written with another dtype: derive the codes from the full vectors
+                codes, scales = quantize(np.asarray(matrix, dtype=np.float32), self.quantization)
+        return records["ids"], records["documents"], records["metadatas"], matrix, codes, scales
+
+    @staticmethod
+    def _write_tmp(path: str, write) -> str:
+        """Write a file next to `path` and flush it to disk; returns the temp path"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    def _save(self, ids, documents, metadatas, matrix):
+        """
+        Write a new snapshot (full vectors, codes, records) to temp files, then
+        swap each in with os.replace. records.json is the manifest and goes
+        last; a crash mid-swap leaves a row count mismatch that _load detects.
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        staged = [(self._write_tmp(self.matrix_path, lambda f: np.save(f, matrix)), self.matrix_path)]
+        if self.quantization != "float32":
+            codes, scales = quantize(matrix, self.quantization)
+            staged.append((self._write_tmp(self.codes_path, lambda f: np.save(f, codes)), self.codes_path))
+            if scales is not None:
+                staged.append((self._write_tmp(self.scales_path, lambda f: np.save(f, scales)), self.scales_path))
+        records = {"ids": ids, "documents": documents, "metadatas": metadatas}
+        staged.append((
+            self._write_tmp(self.records_path, lambda f: f.write(json.dumps(records).encode("utf-8"))),
+            self.records_path
+        ))
+
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+        self._state = self._load()
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def get_ids(self, where=None):
+        ids, _, metadatas = self._state[:3]
+        return [doc_id for doc_id, meta in zip(ids, metadatas) if _matches(meta, where)]
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.apply(upserts=(ids, embeddings, documents, metadatas))
+
+    def update_metadata(self, ids, metadatas):
+        self.apply(metadata_updates=(ids, metadatas))
+
+    def delete(self, ids):
+        self.apply(deletes=ids)
+
+    def apply(self, upserts=None, metadata_updates=None, deletes=None):
+        """Build the next snapshot in memory and swap it in with a single write"""
+        with self._write_lock:
+            old_ids, old_docs, old_metas, old_matrix = self._state[:4]
+            all_ids, all_docs, all_metas = list(old_ids), list(old_docs), list(old_metas)
+            rows = [np.asarray(old_matrix[i], dtype=np.float32) for i in range(len(old_ids))]
+            row_of = {doc_id: row for row, doc_id in enumerate(all_ids)}
+
+            if upserts and upserts[0]:
+                ids, embeddings, documents, metadatas = upserts
+                new_vectors = self._normalize(embeddings)
+                for i, doc_id in enumerate(ids):
+                    if doc_id in row_of:
+                        row = row_of[doc_id]
+                        all_docs[row], all_metas[row], rows[row] = documents[i], metadatas[i], new_vectors[i]
+                    else:
+                        row_of[doc_id] = len(all_ids)
+                        all_ids.append(doc_id)
+                        all_docs.append(documents[i])
+                        all_metas.append(metadatas[i])
+                        rows.append(new_vectors[i])
+
+            if metadata_updates and metadata_updates[0]:
+                for doc_id, meta in zip(*metadata_updates):
+                    if doc_id in row_of:
+                        all_metas[row_of[doc_id]] = meta
+
+            keep = range(len(all_ids))
+            if deletes:
+                drop = set(deletes)
+                keep = [row for row, doc_id in enumerate(all_ids) if doc_id not in drop]
+
+            dim = rows[0].shape[0] if rows else (old_matrix.shape[1] if old_matrix.ndim == 2 else 0)
+            matrix = np.stack([rows[row] for row in keep]) if keep else np.zeros((0, dim), dtype=np.float32)
+            self._save(
+                [all_ids[row] for row in keep],
+                [all_docs[row] for row in keep],
+                [all_metas[row] for row in keep],
+                matrix
+            )
+
+    def _approximate_scores(self, queries: np.ndarray, codes: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+        """First-pass similarity of every query to every code row (higher is closer)"""
+        if self.quantization == "binary":
+            query_bits = np.packbits(queries > 0, axis=1)
+            hamming = np.empty((len(queries), len(codes)), dtype=np.float32)
+            for q, bits in enumerate(query_bits):
+                hamming[q] = popcount(np.bitwise_xor(codes, bits)).sum(axis=1)
+            return -hamming
+        scores = queries @ codes.astype(np.float32).T
+        if scales is not None:
+            scores *= scales[None, :]
+        return scores
+
+    def query(self, query_embeddings, k, where=None):
+        ids, documents, metadatas, matrix, codes, scales = self._state
+        queries = self._normalize(query_embeddings)
+        if not ids:
+            return [[] for _ in range(len(queries))]
+
+        candidates = None
+        if where:
+            candidates = np.array([row for row, meta in enumerate(metadatas) if _matches(meta, where)], dtype=np.int64)
+            if len(candidates) == 0:
+                return [[] for _ in range(len(queries))]
+
+        if codes is None:
+            # Full precision: one exact pass
+            vectors = matrix if candidates is None else matrix[candidates]
+            scores = queries @ np.asarray(vectors, dtype=np.float32).T
+            shortlists = None
+        else:
+            subset_codes = codes if candidates is None else codes[candidates]
+            subset_scales = None if scales is None else (scales if candidates is None else scales[candidates])
+            scores = self._approximate_scores(queries, subset_codes, subset_scales)
+            shortlists = min(k * self.rescore_factor, scores.shape[1])
+
+        k = min(k, scores.shape[1])
+        formatted = []
+        for q in range(len(queries)):
+            if shortlists is None:
+                top = np.argpartition(-scores[q], k - 1)[:k]
+                top_scores = scores[q][top]
+            else:
+                # Rescore the shortlist against the full-precision vectors
+                shortlist = np.argpartition(-scores[q], shortlists - 1)[:shortlists]
+                rows = shortlist if candidates is None else candidates[shortlist]
+                exact = np.asarray(matrix[rows], dtype=np.float32) @ queries[q]
+                best = np.argpartition(-exact, k - 1)[:k]
+                top, top_scores = shortlist[best], exact[best]
+            order = np.argsort(-top_scores)
+            hits = []
+            for col, score in zip(top[order], top_scores[order]):
+                row = int(candidates[col]) if candidates is not None else int(col)
+                hits.append({
+                    'id': ids[row],
+                    'content': documents[row],
+                    'metadata': metadatas[row],
+                    'score': float(score)
+                })
+            formatted.append(hits)
+        return formatted
+
+    def count(self):
+        return len(self._state[0])
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """Build the vector store selected by VECTOR_STORE (chroma | numpy)"""
+    backend = (backend or os.getenv("VECTOR_STORE", "chroma")).lower()
+    if backend == "numpy":
+        rescore_factor = os.getenv("NUMPY_RESCORE_FACTOR")
+        return NumpyVectorStore(
+            path=os.getenv("NUMPY_INDEX_PATH", "./numpy_index"),
+            dtype=os.getenv("NUMPY_INDEX_DTYPE", "float32"),
+            rescore_factor=int(rescore_factor) if rescore_factor else None
+        )
+    hnsw_params = {}
+    for key, env in (("hnsw:M", "CHROMA_HNSW_M"), ("hnsw:construction_ef", "CHROMA_HNSW_CONSTRUCTION_EF"), ("hnsw:search_ef", "CHROMA_HNSW_SEARCH_EF")):
+        if os.getenv(env):
+            hnsw_params[key] = int(os.getenv(env))
+    return ChromaVectorStore(
+        path=os.getenv("CHROMA_PATH", "./chroma_db"),
+        collection_name=os.getenv("CHROMA_COLLECTION", "sarim_resume"),
+        hnsw_params=hnsw_params
+    )
@@ -1,3 +1,4 @@
+import os
 import gradio as gr
 from transformers import AutoModelForCausalLM, AutoTokenizer
 import torch
@@ -35,6 +36,18 @@ ACHIEVEMENTS:
 
 When asked about Abdul, provide specific information from above. Be professional and helpful."""
 
+# Prefer the compiled knowledge pack when one is deployed next to the app
+# (build it with `python -m app.services.knowledge_pack`)
+KNOWLEDGE_PACK = os.getenv("KNOWLEDGE_PACK", "./persona.pack")
+if os.path.exists(KNOWLEDGE_PACK):
+    try:
+        from app.services.knowledge_pack import load_knowledge_pack
+        pack = load_knowledge_pack(KNOWLEDGE_PACK)
+        if pack is not None:
+            ABDUL_INFO = pack.persona_prompt
+    except ImportError as e:
+        print(f"⚠️ Ignoring knowledge pack {KNOWLEDGE_PACK}: {e}")
+
 # Load tokenizer and model
 TOKENIZER_REPO = "Abdul8008/abdul-portfolio-tokenizer"
 MODEL_REPO = "Abdul8008/abdul-portfolio-chatbot"
@@ -0,0 +1,229 @@
+"""
+Retrieval benchmark for RAGService.
+
+Uses the training Q&A pairs as labeled queries: a chunk counts as relevant
+to a question when it contains most of the content words of the curated
+answer. For every configuration in the sweep (embedding backend, vector
+store, Chroma hnsw:* settings, hybrid search) the index is built from
+scratch in a temporary directory, then every query is searched with the
+query caches cleared.
+
+Reports recall@k, hit rate@k, MRR, p50/p95/p99 search latency and index
+build time as JSON, so runs can be diffed across commits:
+
+    python benchmark_retrieval.py --output bench/$(git rev-parse --short HEAD).json
+    python benchmark_retrieval.py --embedding-backends torch,onnx --hnsw-m 16,32 --hnsw-search-ef 10,100
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import itertools
+import subprocess
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.services.bm25_index import tokenize
+from app.services.faq_index import load_qa_pairs
+from app.services.rag_service import RAGService
+
+
+def relevant_chunks(answer: str, chunks: List[str], min_overlap: float) -> set:
+    """Chunks containing at least `min_overlap` of the answer's content words"""
+    answer_terms = set(tokenize(answer))
+    if not answer_terms:
+        return set()
+    return {
+        chunk for chunk in chunks
+        if len(answer_terms & set(tokenize(chunk))) / len(answer_terms) >= min_overlap
+    }
+
+
+def percentile(values: List[float], p: float) -> float:
+    return round(float(np.percentile(values, p)), 3) if values else 0.0
+
+
+def build_configs(args) -> List[Dict[str, Any]]:
+    """Cartesian sweep over embedding backends, stores and hybrid search"""
+    stores = []
+    if "numpy" in args.stores:
+        stores.extend({"VECTOR_STORE": "numpy", "NUMPY_INDEX_DTYPE": dtype} for dtype in args.numpy_dtypes)
+    if "chroma" in args.stores:
+        for m, construction_ef, search_ef in itertools.product(args.hnsw_m, args.hnsw_construction_ef, args.hnsw_search_ef):
+            stores.append({
+                "VECTOR_STORE": "chroma",
+                "CHROMA_HNSW_M": str(m),
+                "CHROMA_HNSW_CONSTRUCTION_EF": str(construction_ef),
+                "CHROMA_HNSW_SEARCH_EF": str(search_ef)
+            })
+
+    configs = []
+    for backend, store, hybrid in itertools.product(args.embedding_backends, stores, args.hybrid):
+        configs.append(dict(store, EMBEDDING_BACKEND=backend, HYBRID_SEARCH=hybrid))
+    return configs
+
+
+async def run_config(config: Dict[str, str], queries: List[Dict[str, str]], args) -> Dict[str, Any]:
+    """Build the index for one configuration and evaluate every query against it"""
+    workdir = tempfile.mkdtemp(prefix="retrieval-bench-")
+    env = dict(
+        config,
+        NUMPY_INDEX_PATH=os.path.join(workdir, "numpy_index"),
+        CHROMA_PATH=os.path.join(workdir, "chroma_db"),
+        BM25_INDEX_PATH=os.path.join(workdir, "bm25_index.json"),
+        EMBEDDING_CACHE_DIR=os.path.join(workdir, "embedding_cache"),
+        PDF_PAGE_CACHE_DIR=os.path.join(workdir, "pdf_page_cache"),
+        # A deployed persona.pack would seed every build; point at one that does not exist
+        KNOWLEDGE_PACK=os.path.join(workdir, "persona.pack")
+    )
+    saved_env = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+
+    rag = RAGService()
+    try:
+        await rag.initialize()
+
+        started = time.perf_counter()
+        index_result = await rag.index_resume(args.pdf)
+        build_seconds = time.perf_counter() - started
+
+        # Unchanged re-index: the incremental path
+        started = time.perf_counter()
+        await rag.index_resume(args.pdf)
+        reindex_seconds = time.perf_counter() - started
+
+        chunks = rag.bm25_index.documents
+        max_k = max(args.k)
+        latencies, reciprocal_ranks = [], []
+        recall = {k: [] for k in args.k}
+        hit_rate = {k: [] for k in args.k}
+        evaluated = 0
+
+        for pair in queries:
+            gold = relevant_chunks(pair["answer"], chunks, args.min_overlap)
+            if not gold:
+                continue
+            evaluated += 1
+
+            # Measure cold searches: embedding + vector store + fusion
+            rag.query_embedding_cache.clear()
+            rag.search_results_cache.clear()
+            started = time.perf_counter()
+            hits = await rag.search_similar(pair["question"], k=max_k)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            retrieved = [hit["content"] for hit in hits]
+            first = next((rank for rank, content in enumerate(retrieved, 1) if content in gold), None)
+            reciprocal_ranks.append(1 / first if first else 0.0)
+            for k in args.k:
+                found = gold & set(retrieved[:k])
+                recall[k].append(len(found) / len(gold))
+                hit_rate[k].append(1.0 if found else 0.0)
+
+        metrics = {"mrr": round(float(np.mean(reciprocal_ranks)), 4) if reciprocal_ranks else 0.0}
+        for k in args.k:
+            metrics[f"recall@{k}"] = round(float(np.mean(recall[k])), 4) if recall[k] else 0.0
+            metrics[f"hit_rate@{k}"] = round(float(np.mean(hit_rate[k])), 4) if hit_rate[k] else 0.0
+
+        return {
+            "config": dict(config, embedder=rag.embeddings_model.name),
+            "documents": index_result["count"],
+            "queries_evaluated": evaluated,
+            "index_build_seconds": round(build_seconds, 3),
+            "reindex_seconds": round(reindex_seconds, 3),
+            "metrics": metrics,
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "mean": round(float(np.mean(latencies)), 3) if latencies else 0.0
+            }
+        }
+    except Exception as e:
+        print(f"❌ {config}: {e}")
+        return {"config": config, "error": str(e)}
+    finally:
+        rag.shutdown()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_args():
+    def csv(cast=str):
+        return lambda value: [cast(item) for item in value.split(",") if item]
+
+    parser = argparse.ArgumentParser(description="Benchmark RAGService retrieval quality and latency")
+    parser.add_argument("--pdf", default=os.getenv("RESUME_PDF_PATH", "./data/abdul@resume.pdf"))
+    parser.add_argument("--qa", type=csv(), default=["../training/comprehensive_training_data.json", "../training/training_data.jsonl"])
+    parser.add_argument("--k", type=csv(int), default=[1, 3, 5])
+    parser.add_argument("--min-overlap", type=float, default=0.6, help="share of answer words a chunk must contain to count as relevant")
+    parser.add_argument("--limit", type=int, default=0, help="evaluate at most this many questions (0 = all)")
+    parser.add_argument("--stores", type=csv(), default=["numpy", "chroma"])
+    parser.add_argument("--numpy-dtypes", type=csv(), default=["float32"], help="float32, float16, int8, binary")
+    parser.add_argument("--embedding-backends", type=csv(), default=[os.getenv("EMBEDDING_BACKEND", "torch")])
+    parser.add_argument("--hnsw-m", type=csv(int), default=[16])
+    parser.add_argument("--hnsw-construction-ef", type=csv(int), default=[100])
+    parser.add_argument("--hnsw-search-ef", type=csv(int), default=[10, 100])
+    parser.add_argument("--hybrid", type=csv(), default=["true", "false"])
+    parser.add_argument("--output", default="retrieval_benchmark.json")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    queries = load_qa_pairs(args.qa)
+    if args.limit:
+        queries = queries[:args.limit]
+    if not queries:
+        sys.exit("No labeled queries found")
+
+    results = []
+    for config in build_configs(args):
+        print(f"▶ {config}")
+        result = await run_config(config, queries, args)
+        if "metrics" in result:
+            print(f"  {result['metrics']} latency={result['latency_ms']} build={result['index_build_seconds']}s")
+        results.append(result)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "embedding_model": os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+            "pdf": args.pdf,
+            "qa_sources": args.qa,
+            "questions": len(queries),
+            "k": args.k,
+            "min_overlap": args.min_overlap
+        },
+        "results": results
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -11,6 +11,9 @@ import asyncio
 from app.services.rag_service import RAGService
 from app.services.llm_service import LLMService
 from app.services.hybrid_chatbot import HybridChatbot
+from app.services.index_jobs import IndexJobManager
+from app.services.source_watcher import SourceWatcher
+from app.services.ollama_client import close_ollama_client
 from app.models.chat import ChatMessage, ChatResponse
 
 load_dotenv()
@@ -30,6 +33,28 @@ app.add_middleware(
 rag_service = RAGService()
 llm_service = LLMService()
 chatbot = HybridChatbot(rag_service, llm_service)
+index_jobs = IndexJobManager(rag_service)
+
+async def reindex_sources():
+    """Incremental re-index triggered by the source watcher"""
+    job = index_jobs.submit(rag_service.resume_pdf_path)
+    job = await index_jobs.wait(job.id)
+    if job.status == "failed":
+        raise RuntimeError(job.error)
+    return job.result
+
+async def has_index():
+    """Whether the store already holds resume chunks (built earlier or seeded from the pack)"""
+    return await rag_service.get_document_count() > 0
+
+source_watcher = SourceWatcher(
+    [rag_service.resume_pdf_path, rag_service.structured_data_path],
+    reindex_sources,
+    is_indexed=has_index,
+    poll_interval=float(os.getenv("SOURCE_WATCH_INTERVAL", "1.0")),
+    debounce_seconds=float(os.getenv("SOURCE_WATCH_DEBOUNCE", "2.0")),
+    state_path=os.getenv("SOURCE_WATCH_STATE", "./index_sources.json")
+)
 
 class ChatRequest(BaseModel):
     message: str
@@ -46,8 +71,19 @@ async def startup_event():
     """Initialize vector database and load models on startup"""
     await rag_service.initialize()
     await llm_service.initialize()
+    await chatbot.initialize()
+    if os.getenv("SOURCE_WATCH_ENABLED", "true").lower() == "true":
+        await source_watcher.start()
     print("✅ Sarim AI Backend Ready!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background workers"""
+    source_watcher.stop()
+    rag_service.shutdown()
+    llm_service.shutdown()
+    await close_ollama_client()
+
 @app.get("/")
 async def root():
     return {"message": "Sarim AI API is running", "status": "healthy"}
@@ -96,19 +132,47 @@ async def chat_stream(request: ChatRequest):
         }
     )
 
-@app.post("/api/index-resume")
+@app.post("/api/index-resume", status_code=202)
 async def index_resume(file_path: str = None):
     """
-    Index resume data into vector database for RAG
+    Queue a background re-index of the resume; poll the returned job or
+    follow its progress stream. Searches keep using the current index
+    until the new one is swapped in.
     """
-    try:
-        if not file_path:
-            file_path = "./data/abdul@resume.pdf"
-        
-        result = await rag_service.index_resume(file_path)
-        return {"status": "success", "documents_indexed": result["count"]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if not file_path:
+        file_path = rag_service.resume_pdf_path
+    
+    job = index_jobs.submit(file_path)
+    return {"status": "accepted", "job_id": job.id, "job": job.to_dict()}
+
+@app.get("/api/index-jobs/{job_id}")
+async def index_job_status(job_id: str):
+    """Status and progress of a background index job"""
+    job = index_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Index job not found")
+    return job.to_dict()
+
+@app.get("/api/index-jobs/{job_id}/events")
+async def index_job_events(job_id: str):
+    """
+    Server-sent progress events for a background index job
+    """
+    if index_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Index job not found")
+    
+    async def generate():
+        async for event in index_jobs.events(job_id):
+            yield f"data: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
 
 @app.get("/api/health")
 async def health_check():
@@ -117,7 +181,18 @@ async def health_check():
         "status": "healthy",
         "rag_status": rag_service.is_initialized,
         "llm_status": llm_service.is_initialized,
-        "vector_db_documents": await rag_service.get_document_count()
+        "vector_db_documents": await rag_service.get_document_count(),
+        "knowledge_pack": rag_service.get_knowledge_pack_info(),
+        "query_cache": rag_service.get_cache_stats(),
+        "query_batcher": rag_service.get_batch_stats(),
+        "executors": dict(rag_service.get_executor_stats(), generation=llm_service.get_executor_stats()),
+        "rerank": rag_service.get_rerank_stats(),
+        "query_routing": rag_service.get_routing_stats(),
+        "index_jobs": index_jobs.stats(),
+        "source_watcher": source_watcher.stats(),
+        "answer_cache": chatbot.get_cache_stats(),
+        "faq": chatbot.get_faq_stats(),
+        "context_packing": chatbot.get_context_stats()
     }
 
 if __name__ == "__main__":
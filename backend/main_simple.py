@@ -4,10 +4,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import requests
+import httpx
 import json
 from typing import Optional
 from datetime import datetime
+from app.services.ollama_client import get_ollama_client, close_ollama_client
 
 app = FastAPI(title="Abdul's Portfolio Chatbot API")
 
@@ -29,6 +30,12 @@ class ChatResponse(BaseModel):
     conversation_id: str
     timestamp: str
 
+ollama = get_ollama_client()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_ollama_client()
+
 # In-memory conversation storage (for demo)
 conversations = {}
 
@@ -63,35 +70,30 @@ Key facts:
 IMPORTANT: Keep responses SHORT and ACCURATE. Only answer what is asked. Do NOT add extra information."""
         
         # Call Ollama API
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "abdul-finetuned",
-                "prompt": f"{system_context}\n\nUser: {request.message}\nGive a direct, short answer (max 15 words):",
-                "stream": False,
+        result = await ollama.generate(
+            "abdul-finetuned",
+            f"{system_context}\n\nUser: {request.message}\nGive a direct, short answer (max 15 words):",
+            {
                 "temperature": 0.5,  # Lower temperature for more focused responses
                 "top_p": 0.9,
-                "max_tokens": 100,  # Limit response length
+                "num_predict": 100,  # Limit response length
                 "stop": ["User:", "\n\n"]  # Stop generation at these sequences
             }
         )
         
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result.get("response", "I'm having trouble understanding that. Could you please rephrase?")
-            
-            # Store AI response
-            conversations[conversation_id].append({"assistant": ai_response})
-            
-            return ChatResponse(
-                response=ai_response,
-                conversation_id=conversation_id,
-                timestamp=datetime.now().isoformat()
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Model API error")
-            
-    except requests.exceptions.RequestException as e:
+        ai_response = result.get("response", "I'm having trouble understanding that. Could you please rephrase?")
+        
+        # Store AI response
+        conversations[conversation_id].append({"assistant": ai_response})
+        
+        return ChatResponse(
+            response=ai_response,
+            conversation_id=conversation_id,
+            timestamp=datetime.now().isoformat()
+        )
+    except httpx.HTTPStatusError:
+        raise HTTPException(status_code=500, detail="Model API error")
+    except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail="Cannot connect to Ollama. Make sure it's running.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
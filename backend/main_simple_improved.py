@@ -4,10 +4,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import requests
+import httpx
 import json
 from typing import Optional
 from datetime import datetime
+from app.services.ollama_client import get_ollama_client, close_ollama_client
 
 app = FastAPI(title="Abdul's Portfolio Chatbot API")
 
@@ -29,6 +30,12 @@ class ChatResponse(BaseModel):
     conversation_id: str
     timestamp: str
 
+ollama = get_ollama_client()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_ollama_client()
+
 # In-memory conversation storage (for demo)
 conversations = {}
 
@@ -98,40 +105,35 @@ User Question: {request.message}
 Answer as Sayed Abdul Karim. Be direct and brief (under 50 words):"""
         
         # Call Ollama API with abdul-finetuned model
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "abdul-finetuned",
-                "prompt": prompt,
-                "stream": False,
+        result = await ollama.generate(
+            "abdul-finetuned",
+            prompt,
+            {
                 "temperature": 0.3,  # Lower for more consistent responses
                 "top_p": 0.9,
-                "max_tokens": 100,
+                "num_predict": 100,
                 "stop": ["User:", "\n\n", "Question:"]
             }
         )
         
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result.get("response", "I'm having trouble understanding that. Could you please rephrase?")
-            
-            # Clean up the response
-            ai_response = ai_response.strip()
-            if len(ai_response) > 200:
-                ai_response = ai_response[:197] + "..."
-            
-            # Store AI response
-            conversations[conversation_id].append({"assistant": ai_response})
-            
-            return ChatResponse(
-                response=ai_response,
-                conversation_id=conversation_id,
-                timestamp=datetime.now().isoformat()
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Model API error")
-            
-    except requests.exceptions.RequestException as e:
+        ai_response = result.get("response", "I'm having trouble understanding that. Could you please rephrase?")
+        
+        # Clean up the response
+        ai_response = ai_response.strip()
+        if len(ai_response) > 200:
+            ai_response = ai_response[:197] + "..."
+        
+        # Store AI response
+        conversations[conversation_id].append({"assistant": ai_response})
+        
+        return ChatResponse(
+            response=ai_response,
+            conversation_id=conversation_id,
+            timestamp=datetime.now().isoformat()
+        )
+    except httpx.HTTPStatusError:
+        raise HTTPException(status_code=500, detail="Model API error")
+    except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail="Cannot connect to Ollama. Make sure it's running.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,11 +4,15 @@ Extract and structure resume data for training Llama 3.2 1B
 """
 
 import json
-import PyPDF2
+import sys
 import re
 from typing import Dict, List, Any
 from pathlib import Path
 
+# Share the backend's PDF extraction stage (parallel, cached, time/memory limited)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from app.services.pdf_extractor import PDFExtractor
+
 class ResumeExtractor:
     def __init__(self, pdf_path: str):
         self.pdf_path = pdf_path
@@ -18,14 +22,9 @@ class ResumeExtractor:
     def extract_pdf_text(self) -> str:
         """Extract text from PDF resume"""
         try:
-            with open(self.pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-                self.text = text
-                return text
+            text = PDFExtractor().extract_text(self.pdf_path, separator="")
+            self.text = text
+            return text
         except Exception as e:
             print(f"Error extracting PDF: {e}")
             return self.get_fallback_data()